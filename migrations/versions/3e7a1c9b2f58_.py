@@ -0,0 +1,118 @@
+"""empty message
+
+Revision ID: 3e7a1c9b2f58
+Revises: 8d2c6a4e9b15
+Create Date: 2026-10-19 16:40:12.552018
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3e7a1c9b2f58'
+down_revision: Union[str, Sequence[str], None] = '8d2c6a4e9b15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("""
+    CREATE MATERIALIZED VIEW researcher_year_indicators AS
+    WITH production AS (
+        SELECT researcher_id, year_ AS year,
+            CASE WHEN type = 'ARTICLE' THEN 'articles' ELSE 'books' END AS indicator
+        FROM bibliographic_production
+        WHERE type IN ('ARTICLE', 'BOOK', 'BOOK_CHAPTER')
+
+        UNION ALL
+
+        SELECT researcher_id, year,
+            CASE WHEN code IS NULL THEN 'no_reg_software' ELSE 'software' END
+        FROM software
+
+        UNION ALL
+
+        SELECT researcher_id, year, 'cultivar_patents'
+        FROM registered_cultivar
+
+        UNION ALL
+
+        SELECT researcher_id, development_year_, 'cultivar_patents'
+        FROM patent
+
+        UNION ALL
+
+        SELECT researcher_id, year_, 'other_technical_production'
+        FROM industrial_design
+
+        UNION ALL
+
+        SELECT researcher_id, year, 'other_technical_production'
+        FROM brand
+
+        UNION ALL
+
+        SELECT researcher_id, year, 'other_technical_production'
+        FROM research_report
+
+        UNION ALL
+
+        SELECT researcher_id, year,
+            CASE
+                WHEN nature = 'Supervisão De Pós-Doutorado' THEN 'guidance_postdoc'
+                WHEN nature = 'Tese De Doutorado' AND status = 'Concluída'
+                    THEN 'phd_completed'
+                WHEN nature = 'Tese De Doutorado' AND status = 'Em andamento'
+                    THEN 'phd_ongoing'
+                WHEN nature = 'Dissertação De Mestrado' AND status = 'Concluída'
+                    THEN 'msc_completed'
+                WHEN nature = 'Dissertação De Mestrado' AND status = 'Em andamento'
+                    THEN 'msc_ongoing'
+            END
+        FROM guidance
+        WHERE nature IN (
+            'Supervisão De Pós-Doutorado',
+            'Tese De Doutorado',
+            'Dissertação De Mestrado'
+        )
+    )
+    SELECT
+        researcher_id,
+        year,
+        COUNT(*) FILTER (WHERE indicator = 'articles') AS articles,
+        COUNT(*) FILTER (WHERE indicator = 'books') AS books,
+        COUNT(*) FILTER (WHERE indicator = 'software') AS software,
+        COUNT(*) FILTER (WHERE indicator = 'no_reg_software') AS no_reg_software,
+        COUNT(*) FILTER (WHERE indicator = 'cultivar_patents') AS cultivar_patents,
+        COUNT(*) FILTER (
+            WHERE indicator = 'other_technical_production'
+        ) AS other_technical_production,
+        COUNT(*) FILTER (WHERE indicator = 'guidance_postdoc') AS guidance_postdoc,
+        COUNT(*) FILTER (WHERE indicator = 'phd_completed') AS phd_completed,
+        COUNT(*) FILTER (WHERE indicator = 'phd_ongoing') AS phd_ongoing,
+        COUNT(*) FILTER (WHERE indicator = 'msc_completed') AS msc_completed,
+        COUNT(*) FILTER (WHERE indicator = 'msc_ongoing') AS msc_ongoing
+    FROM production
+    WHERE researcher_id IS NOT NULL
+        AND year IS NOT NULL
+        AND indicator IS NOT NULL
+    GROUP BY researcher_id, year
+    WITH DATA;
+    """)
+    op.execute("""
+    CREATE UNIQUE INDEX ix_researcher_year_indicators_researcher_year
+    ON researcher_year_indicators (researcher_id, year);
+    """)
+    op.execute("""
+    CREATE INDEX ix_researcher_year_indicators_year
+    ON researcher_year_indicators (year);
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS researcher_year_indicators;")
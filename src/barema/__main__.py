@@ -1,9 +1,7 @@
 import click
 
-from barema.core.report_generation import generate_final_report
-from barema.core.report_production import report_production_csv
-from barema.core.review_data import review_data
-from barema.core.setup import db_up, populate_db, seeding
+# Command modules are imported inside each command so `barema --help` and
+# the light commands do not load langchain, PDF tooling or the database.
 
 
 @click.group()
@@ -13,23 +11,93 @@ def cli():
 
 @cli.command()
 def review():
+    from barema.core.review_data import review_data
+
     click.echo("Iniciando visualização de dados...")
     review_data()
 
 
 @cli.command()
-def setup():
+@click.option("--native", is_flag=True, help="Carrega os XMLs sem o Hop.")
+def setup(native):
+    from barema.core.setup import db_up, populate_db, seeding
+
     click.echo("Iniciando a montagem do banco de dados...")
     db_up()
     seeding()
-    populate_db()
+    populate_db(native)
+
+
+@cli.command()
+@click.option("--path", type=click.Path(exists=True), default=None)
+@click.option("--workers", type=int, default=None)
+@click.option("--delta", is_flag=True, help="Só regrava currículos alterados.")
+def ingest(path, workers, delta):
+    from barema.services.ingestion import LATTES_PATH, MAX_WORKERS, ingest_lattes
+    from barema.services.post_ingestion import (
+        refresh_indicators,
+        resolve_project_coordinators,
+        sync_production_years,
+    )
+
+    click.echo("Carregando currículos Lattes...")
+    changed, failed = ingest_lattes(path or LATTES_PATH, workers or MAX_WORKERS, delta)
+    if changed:
+        sync_production_years()
+        resolve_project_coordinators()
+        refresh_indicators()
+    elif not failed:
+        click.echo("Nenhuma alteração; indicadores mantidos.")
+
+    if failed:
+        raise click.ClickException(f"{failed} currículo(s) não foram carregados.")
+
+
+@cli.command()
+@click.argument("path", type=click.Path(exists=True))
+def openalex_snapshot(path):
+    from barema.services.openAlex import ingest_openalex_snapshot
+
+    click.echo("Importando snapshot do OpenAlex...")
+    ingest_openalex_snapshot(path)
+
+
+@cli.command(
+    help=(
+        "Particiona bibliographic_production e guidance por ano. Operação "
+        "irreversível: a chave primária vira UNIQUE (id, ano) e as chaves "
+        "estrangeiras que apontam para essas tabelas (ex.: os detalhes de "
+        "artigos, livros e capítulos) são removidas, pois o PostgreSQL não "
+        "aceita referências sem a coluna de partição."
+    )
+)
+@click.option("--start-year", type=int, default=None)
+@click.option("--end-year", type=int, default=None)
+@click.option("--archive-before", type=int, default=None)
+@click.option("--tablespace", default=None)
+def partition(start_year, end_year, archive_before, tablespace):
+    from barema.services.partitioning import (
+        DEFAULT_START_YEAR,
+        archive_partitions,
+        extend_partitions,
+        partition_production_tables,
+    )
+
+    click.echo("Particionando tabelas de produção por ano...")
+    partition_production_tables(
+        start_year or DEFAULT_START_YEAR, end_year, archive_before, tablespace
+    )
+    extend_partitions(end_year)
+    if archive_before and tablespace:
+        archive_partitions(archive_before, tablespace)
 
 
 @cli.command()
 def report():
+    from barema.core.report_generation import generate_final_report
+
     click.echo("Gerando o relatório...")
     generate_final_report()
-    report_production_csv()
 
 
 if __name__ == "__main__":
@@ -1,8 +1,13 @@
 import os
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
 from datetime import datetime
+from functools import partial
 
 import polars as pl
 
+from barema.core.report_production import report_production_csv
+from barema.db.connection import read_snapshot
 from barema.services.ai_evaluation import evaluate_projects
 from barema.services.ai_extraction import get_transfer_of_technology
 from barema.services.ai_sumula import analyze_sumula
@@ -34,6 +39,8 @@ from barema.services.report_utils import (
 
 current_year = datetime.now().year
 
+REPORT_WORKERS = 4
+
 # fmt: off
 CONFIG = [
     {"old_name": "nome", "new_name": "Nome", "default_value": ""},
@@ -82,21 +89,23 @@ CONFIG = [
 # fmt: on
 
 
-def researcher_profile_csv(base_year=current_year):
-    researchers = get_researchers()
+def load_report_base():
+    return get_researchers(), get_foment_level()
+
+
+def researcher_profile_csv(researchers, foment_level, base_year=current_year):
     phd_time = get_phd_time()
     researchers = merge_data(researchers, phd_time)
     phd_level = add_phd_level(phd_time)
     researchers = merge_data(researchers, phd_level)
-    foment_level = get_foment_level()
     researchers = merge_data(researchers, foment_level)
     researchers.write_csv("data/csv/researcher_profile.csv")
     researchers.write_excel("data/csv/researcher_profile.xlsx")
 
 
-def technological_production_and_innovation_csv(base_year=current_year):
-    researchers = get_researchers()
-    foment_level = get_foment_level()
+def technological_production_and_innovation_csv(
+    researchers, foment_level, base_year=current_year
+):
     researchers = merge_data(researchers, foment_level)
     researchers = add_evaluation_window(researchers)
     productions_to_process = [
@@ -115,9 +124,7 @@ def technological_production_and_innovation_csv(base_year=current_year):
     researchers.write_excel("data/csv/technological_production_and_innovation.xlsx")
 
 
-def transfer_of_technology_csv():
-    researchers = get_researchers()
-    foment_level = get_foment_level()
+def transfer_of_technology_csv(researchers, foment_level):
 
     researchers = merge_data(researchers, foment_level)
     researchers = add_evaluation_window(researchers)
@@ -133,9 +140,7 @@ def transfer_of_technology_csv():
     df_final.write_excel(output_xlsx)
 
 
-def sumula_csv():
-    researchers = get_researchers()
-    foment_level = get_foment_level()
+def sumula_csv(researchers, foment_level):
 
     researchers = merge_data(researchers, foment_level)
     researchers = add_evaluation_window(researchers)
@@ -151,9 +156,7 @@ def sumula_csv():
     df_final.write_excel(output_xlsx)
 
 
-def human_resources_csv():
-    researchers = get_researchers()
-    foment_level = get_foment_level()
+def human_resources_csv(researchers, foment_level):
     researchers = merge_data(researchers, foment_level)
     researchers = add_evaluation_window(researchers)
     productions_to_process = [
@@ -169,9 +172,7 @@ def human_resources_csv():
     researchers.write_excel("data/csv/human_resources.xlsx")
 
 
-def project_analysis_csv(base_year=current_year):
-    researchers = get_researchers()
-    foment_level = get_foment_level()
+def project_analysis_csv(researchers, foment_level, base_year=current_year):
 
     researchers = merge_data(researchers, foment_level)
     researchers = add_evaluation_window(researchers)
@@ -187,10 +188,10 @@ def project_analysis_csv(base_year=current_year):
     df_final.write_excel(output_xlsx)
 
 
-def _get_projects_base():
+def _get_projects_base(min_year=None):
     agencies = get_project_funding_agencies()
     df_analyzed = analyze_funding_agencies(agencies)
-    projects = get_research_projects()
+    projects = get_research_projects(min_year)
 
     return (
         projects.explode("agency_names")
@@ -205,8 +206,8 @@ def _get_projects_base():
     )
 
 
-def get_coord_cientifico_tecnologico():
-    df = _get_projects_base()
+def get_coord_cientifico_tecnologico(min_year=None):
+    df = _get_projects_base(min_year)
     df = df.filter(
         (pl.col("nature") != "PESQUISA")
         & (~pl.col("has_company_funding"))
@@ -222,8 +223,8 @@ def get_coord_cientifico_tecnologico():
     )
 
 
-def get_membro_cientifico_tecnologico():
-    df = _get_projects_base()
+def get_membro_cientifico_tecnologico(min_year=None):
+    df = _get_projects_base(min_year)
     df = df.filter(
         (pl.col("nature") != "PESQUISA")
         & (~pl.col("has_company_funding"))
@@ -239,8 +240,8 @@ def get_membro_cientifico_tecnologico():
     )
 
 
-def get_coord_empresa():
-    df = _get_projects_base()
+def get_coord_empresa(min_year=None):
+    df = _get_projects_base(min_year)
     df = df.filter((pl.col("has_company_funding")) & (pl.col("is_coordinator")))
     df = df.group_by(["researcher_id", "year"]).agg(pl.count().alias("qtd"))
     return df.with_columns(
@@ -252,8 +253,8 @@ def get_coord_empresa():
     )
 
 
-def get_membro_empresa():
-    df = _get_projects_base()
+def get_membro_empresa(min_year=None):
+    df = _get_projects_base(min_year)
     df = df.filter((pl.col("has_company_funding")) & (~pl.col("is_coordinator")))
     df = df.group_by(["researcher_id", "year"]).agg(pl.count().alias("qtd"))
     return df.with_columns(
@@ -265,8 +266,8 @@ def get_membro_empresa():
     )
 
 
-def get_coord_pesquisa():
-    df = _get_projects_base()
+def get_coord_pesquisa(min_year=None):
+    df = _get_projects_base(min_year)
     df = df.filter(
         (pl.col("nature") == "PESQUISA")
         & (~pl.col("has_company_funding"))
@@ -282,8 +283,8 @@ def get_coord_pesquisa():
     )
 
 
-def get_membro_pesquisa():
-    df = _get_projects_base()
+def get_membro_pesquisa(min_year=None):
+    df = _get_projects_base(min_year)
     df = df.filter(
         (pl.col("nature") == "PESQUISA")
         & (~pl.col("has_company_funding"))
@@ -299,9 +300,7 @@ def get_membro_pesquisa():
     )
 
 
-def participation_in_project_csv():
-    researchers = get_researchers()
-    foment_level = get_foment_level()
+def participation_in_project_csv(researchers, foment_level):
     researchers = merge_data(researchers, foment_level)
     researchers = add_evaluation_window(researchers)
 
@@ -370,16 +369,39 @@ def merge_all_reports():
     df_final.write_excel("data/csv/output/unified_report.xlsx")
 
 
+def run_sections(sections):
+    with ThreadPoolExecutor(max_workers=REPORT_WORKERS) as executor:
+        futures = [executor.submit(copy_context().run, section) for section in sections]
+        for future in futures:
+            future.result()
+
+
 def generate_final_report():
     os.makedirs("data/csv/output", exist_ok=True)
 
-    researcher_profile_csv()
-    technological_production_and_innovation_csv()
-    transfer_of_technology_csv()
-    project_analysis_csv()
-    human_resources_csv()
-    participation_in_project_csv()
-    sumula_csv()
+    # The snapshot only covers the database reads; the LLM work runs outside
+    # it so its transaction is not held open for hours. Classifying the
+    # funding agencies first fills their cache before the snapshot opens.
+    analyze_funding_agencies(get_project_funding_agencies())
+
+    with read_snapshot():
+        researchers, foment_level = load_report_base()
+        run_sections(
+            [
+                partial(section, researchers, foment_level)
+                for section in (
+                    researcher_profile_csv,
+                    technological_production_and_innovation_csv,
+                    human_resources_csv,
+                    participation_in_project_csv,
+                )
+            ]
+            + [report_production_csv]
+        )
+
+    transfer_of_technology_csv(researchers, foment_level)
+    project_analysis_csv(researchers, foment_level)
+    sumula_csv(researchers, foment_level)
 
     merge_all_reports()
 
@@ -1,3 +1,6 @@
+from functools import lru_cache
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -5,4 +8,21 @@ class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
 
     DATABASE_URL: str
-    OPENAI_API_KEY: str
+    OPENAI_API_KEY: str | None = None
+    OPENALEX_MAILTO: str | None = None
+    # HMAC key for the CPF -> Lattes ID cache; required by surac_pipeline.
+    CPF_HASH_KEY: str | None = None
+    LLM_BACKEND: Literal["openai", "fake"] = "openai"
+    FAKE_LLM_LATENCY: float = 0.5
+    FAKE_LLM_ERROR_RATE: float = 0.0
+    FAKE_LLM_OUTPUT_TOKENS: int = 200
+    FAKE_LLM_SEED: int = 0
+    DB_POOL_SIZE: int = 8
+    DB_MAX_OVERFLOW: int = 4
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+
+
+@lru_cache
+def get_settings() -> Settings:
+    return Settings()
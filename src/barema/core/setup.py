@@ -4,8 +4,15 @@ import sys
 import click
 import polars as pl
 
+from barema.core.settings import get_settings
 from barema.services.download_lattes import add_lattes_id, download_lattes_xml
+from barema.services.ingestion import ingest_lattes
 from barema.services.openAlex import scrapping_researcher_data
+from barema.services.post_ingestion import (
+    refresh_indicators,
+    resolve_project_coordinators,
+    sync_production_years,
+)
 from barema.services.pre_process_projects import (
     download_attachments,
     extract_project_metadata,
@@ -52,6 +59,10 @@ def seeding():
 
 
 def surac_pipeline():
+    if not get_settings().CPF_HASH_KEY:
+        print("CPF_HASH_KEY não configurada no .env (veja .env.example).")
+        sys.exit(1)
+
     print("Preparando pesquisadores")
     folder_path = r"data/raw/projects"
     researchers = extract_project_metadata(folder_path)
@@ -68,28 +79,41 @@ def surac_pipeline():
     normalize_filename(researchers, folder_path, "Arquivo")
     download_attachments(researchers, folder_path)
     download_lattes_xml(researchers)
+    return researchers
 
 def regular_pipeline():
     folder_path = r"data/raw/researchers.csv"
-    researchers = pl.read_csv(folder_path)
+    researchers = pl.read_csv(folder_path, schema_overrides={"lattes_id": pl.Utf8})
     download_lattes_xml(researchers)
+    return researchers
     
-def populate_db():
+def populate_db(native: bool = False):
+    failed = 0
     try:
-        # surac_pipeline()
-        regular_pipeline()
-        hop_command = [
-            "docker",
-            "compose",
-            "run",
-            "--rm",
-            "barema_hop",
-        ]
-        subprocess.run(hop_command, check=True)
-        scrapping_researcher_data()
+        # researchers = surac_pipeline()
+        researchers = regular_pipeline()
+        if native:
+            _, failed = ingest_lattes()
+        else:
+            hop_command = [
+                "docker",
+                "compose",
+                "run",
+                "--rm",
+                "barema_hop",
+            ]
+            subprocess.run(hop_command, check=True)
+        scrapping_researcher_data(researchers["lattes_id"].drop_nulls().to_list())
+        sync_production_years()
+        resolve_project_coordinators()
+        refresh_indicators()
     except subprocess.CalledProcessError as e:
         print(f"Falha na execução. Código de saída: {e.returncode}")
         sys.exit(1)
     except FileNotFoundError:
         print("Comando não encontrado no sistema.")
         sys.exit(1)
+
+    if failed:
+        print(f"{failed} currículo(s) não foram carregados.")
+        sys.exit(1)
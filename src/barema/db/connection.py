@@ -1,19 +1,72 @@
+import re
+from contextlib import contextmanager
+from contextvars import ContextVar
 from functools import lru_cache
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
 from sqlalchemy.orm import Session, sessionmaker
 
-from barema.core.settings import Settings
+from barema.core.settings import get_settings
 
-settings = Settings()
+SNAPSHOT_OPTIONS = {"isolation_level": "REPEATABLE READ", "postgresql_readonly": True}
+SNAPSHOT_PATTERN = re.compile(r"^[0-9A-Fa-f]+-[0-9A-Fa-f]+(-[0-9]+)?$")
 
-engine = create_engine(settings.DATABASE_URL, future=True)
+snapshot_id: ContextVar[str | None] = ContextVar("snapshot_id", default=None)
 
-SessionLocal = sessionmaker(
-    autocommit=False, autoflush=False, bind=engine, class_=Session
-)
+
+@lru_cache
+def get_engine():
+    settings = get_settings()
+    return create_engine(
+        settings.DATABASE_URL,
+        future=True,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=True,
+    )
 
 
 @lru_cache
+def get_sessionmaker():
+    return sessionmaker(
+        autocommit=False, autoflush=False, bind=get_engine(), class_=Session
+    )
+
+
+@contextmanager
 def get_session():
-    return SessionLocal()
+    session = get_sessionmaker()()
+    snapshot = snapshot_id.get()
+    try:
+        if snapshot is not None:
+            session.connection(execution_options=SNAPSHOT_OPTIONS)
+            session.execute(text(f"SET TRANSACTION SNAPSHOT '{snapshot}'"))
+        yield session
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+@contextmanager
+def read_snapshot():
+    if snapshot_id.get() is not None:
+        yield snapshot_id.get()
+        return
+
+    with get_engine().connect().execution_options(**SNAPSHOT_OPTIONS) as connection:
+        with connection.begin():
+            exported = connection.execute(text("SELECT pg_export_snapshot()"))
+            snapshot = exported.scalar_one()
+            if not SNAPSHOT_PATTERN.match(snapshot):
+                raise ValueError(f"Snapshot inválido: {snapshot}")
+
+            token = snapshot_id.set(snapshot)
+            try:
+                yield snapshot
+            finally:
+                snapshot_id.reset(token)
@@ -4,8 +4,10 @@ from uuid import UUID
 
 from sqlalchemy import (
     Boolean,
+    Computed,
     Float,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
@@ -18,6 +20,13 @@ from sqlalchemy.orm import Mapped, mapped_column, registry
 table_registry = registry()
 
 
+def integer_year(column: str) -> Computed:
+    return Computed(
+        f"CASE WHEN {column} ~ '^[0-9]{{4}}$' THEN {column}::integer END",
+        persisted=True,
+    )
+
+
 @table_registry.mapped_as_dataclass
 class Country:
     __tablename__ = "country"
@@ -406,6 +415,10 @@ class BibliographicProduction:
     year_: Mapped[Optional[int]] = mapped_column(Integer, default=None)
     is_new: Mapped[Optional[bool]] = mapped_column(Boolean, default=True)
 
+    __table_args__ = (
+        Index("ix_bibliographic_production_researcher_id", "researcher_id"),
+    )
+
 
 @table_registry.mapped_as_dataclass
 class BibliographicProductionArticle:
@@ -522,6 +535,8 @@ class Software:
     )
     code: Mapped[Optional[str]] = mapped_column(String, default=None)
 
+    __table_args__ = (Index("ix_software_researcher_id", "researcher_id"),)
+
 
 @table_registry.mapped_as_dataclass
 class Patent:
@@ -542,6 +557,9 @@ class Patent:
         Boolean, server_default=text("false"), default=False
     )
     development_year: Mapped[Optional[str]] = mapped_column(String, default=None)
+    development_year_: Mapped[Optional[int]] = mapped_column(
+        Integer, integer_year("development_year"), init=False
+    )
     details: Mapped[Optional[str]] = mapped_column(Text, default=None)
     researcher_id: Mapped[Optional[UUID]] = mapped_column(
         ForeignKey("researcher.id"), default=None
@@ -556,6 +574,8 @@ class Patent:
         Integer, server_default=text("0"), default=0
     )
 
+    __table_args__ = (Index("ix_patent_researcher_id", "researcher_id"),)
+
 
 @table_registry.mapped_as_dataclass
 class ResearchReport:
@@ -581,6 +601,8 @@ class ResearchReport:
         Integer, server_default=text("0"), default=0
     )
 
+    __table_args__ = (Index("ix_research_report_researcher_id", "researcher_id"),)
+
 
 @table_registry.mapped_as_dataclass
 class Brand:
@@ -612,6 +634,8 @@ class Brand:
         Integer, server_default=text("0"), default=0
     )
 
+    __table_args__ = (Index("ix_brand_researcher_id", "researcher_id"),)
+
 
 @table_registry.mapped_as_dataclass
 class AdvisoryActivity:
@@ -726,10 +750,15 @@ class ResearchProject:
         Integer, server_default=text("0"), default=0
     )
     description: Mapped[Optional[str]] = mapped_column(Text, default=None)
+    is_coordinator: Mapped[bool] = mapped_column(
+        Boolean, server_default=text("false"), default=False
+    )
     stars: Mapped[Optional[int]] = mapped_column(
         Integer, server_default=text("0"), default=0
     )
 
+    __table_args__ = (Index("ix_research_project_researcher_id", "researcher_id"),)
+
 
 @table_registry.mapped_as_dataclass
 class ResearchProjectComponents:
@@ -748,6 +777,15 @@ class ResearchProjectComponents:
         Boolean, server_default=text("false"), default=False
     )
 
+    __table_args__ = (
+        Index(
+            "ix_research_project_components_project_lattes",
+            "project_id",
+            "lattes_id",
+            postgresql_include=["coordinator"],
+        ),
+    )
+
 
 @table_registry.mapped_as_dataclass
 class ResearchProjectFoment:
@@ -889,6 +927,9 @@ class ProcessOrTechnique:
     nature: Mapped[Optional[str]] = mapped_column(String, default=None)
     title_en: Mapped[Optional[str]] = mapped_column(Text, default=None)
     year: Mapped[Optional[str]] = mapped_column(String, default=None)
+    year_: Mapped[Optional[int]] = mapped_column(
+        Integer, integer_year("year"), init=False
+    )
     country: Mapped[Optional[str]] = mapped_column(String, default=None)
     language: Mapped[Optional[str]] = mapped_column(String, default=None)
     dissemination_medium: Mapped[Optional[str]] = mapped_column(String, default=None)
@@ -924,6 +965,9 @@ class Mockup:
     production_sequence: Mapped[Optional[int]] = mapped_column(Integer, default=None)
     title_en: Mapped[Optional[str]] = mapped_column(String, default=None)
     year: Mapped[Optional[str]] = mapped_column(String, default=None)
+    year_: Mapped[Optional[int]] = mapped_column(
+        Integer, integer_year("year"), init=False
+    )
     country: Mapped[Optional[str]] = mapped_column(String, default=None)
     language: Mapped[Optional[str]] = mapped_column(String, default=None)
     dissemination_medium: Mapped[Optional[str]] = mapped_column(String, default=None)
@@ -948,6 +992,9 @@ class Publishing:
     production_sequence: Mapped[Optional[int]] = mapped_column(Integer, default=None)
     title_en: Mapped[Optional[str]] = mapped_column(String, default=None)
     year: Mapped[Optional[str]] = mapped_column(String, default=None)
+    year_: Mapped[Optional[int]] = mapped_column(
+        Integer, integer_year("year"), init=False
+    )
     country: Mapped[Optional[str]] = mapped_column(String, default=None)
     language: Mapped[Optional[str]] = mapped_column(String, default=None)
     dissemination_medium: Mapped[Optional[str]] = mapped_column(String, default=None)
@@ -972,12 +1019,17 @@ class IndustrialDesign:
     production_sequence: Mapped[Optional[int]] = mapped_column(Integer, default=None)
     title_en: Mapped[Optional[str]] = mapped_column(String, default=None)
     year: Mapped[Optional[str]] = mapped_column(String, default=None)
+    year_: Mapped[Optional[int]] = mapped_column(
+        Integer, integer_year("year"), init=False
+    )
     country: Mapped[Optional[str]] = mapped_column(String, default=None)
     language: Mapped[Optional[str]] = mapped_column(String, default=None)
     dissemination_medium: Mapped[Optional[str]] = mapped_column(String, default=None)
     homepage: Mapped[Optional[str]] = mapped_column(String, default=None)
     doi: Mapped[Optional[str]] = mapped_column(String, default=None)
 
+    __table_args__ = (Index("ix_industrial_design_researcher_id", "researcher_id"),)
+
 
 @table_registry.mapped_as_dataclass
 class MaintenanceArtisticWork:
@@ -996,6 +1048,9 @@ class MaintenanceArtisticWork:
     production_sequence: Mapped[Optional[int]] = mapped_column(Integer, default=None)
     title_en: Mapped[Optional[str]] = mapped_column(String, default=None)
     year: Mapped[Optional[str]] = mapped_column(String, default=None)
+    year_: Mapped[Optional[int]] = mapped_column(
+        Integer, integer_year("year"), init=False
+    )
     country: Mapped[Optional[str]] = mapped_column(String, default=None)
     language: Mapped[Optional[str]] = mapped_column(String, default=None)
     dissemination_medium: Mapped[Optional[str]] = mapped_column(String, default=None)
@@ -1020,6 +1075,9 @@ class LetterMapOrSimilar:
     production_sequence: Mapped[Optional[int]] = mapped_column(Integer, default=None)
     title_en: Mapped[Optional[str]] = mapped_column(String, default=None)
     year: Mapped[Optional[str]] = mapped_column(String, default=None)
+    year_: Mapped[Optional[int]] = mapped_column(
+        Integer, integer_year("year"), init=False
+    )
     country: Mapped[Optional[str]] = mapped_column(String, default=None)
     language: Mapped[Optional[str]] = mapped_column(String, default=None)
     dissemination_medium: Mapped[Optional[str]] = mapped_column(String, default=None)
@@ -1044,6 +1102,9 @@ class ShortCourseTaught:
     production_sequence: Mapped[Optional[int]] = mapped_column(Integer, default=None)
     title_en: Mapped[Optional[str]] = mapped_column(String, default=None)
     year: Mapped[Optional[str]] = mapped_column(String, default=None)
+    year_: Mapped[Optional[int]] = mapped_column(
+        Integer, integer_year("year"), init=False
+    )
     country: Mapped[Optional[str]] = mapped_column(String, default=None)
     language: Mapped[Optional[str]] = mapped_column(String, default=None)
     dissemination_medium: Mapped[Optional[str]] = mapped_column(String, default=None)
@@ -1068,6 +1129,9 @@ class RadioOrTvProgram:
     production_sequence: Mapped[Optional[int]] = mapped_column(Integer, default=None)
     title_en: Mapped[Optional[str]] = mapped_column(String, default=None)
     year: Mapped[Optional[str]] = mapped_column(String, default=None)
+    year_: Mapped[Optional[int]] = mapped_column(
+        Integer, integer_year("year"), init=False
+    )
     country: Mapped[Optional[str]] = mapped_column(String, default=None)
     language: Mapped[Optional[str]] = mapped_column(String, default=None)
     dissemination_medium: Mapped[Optional[str]] = mapped_column(String, default=None)
@@ -1092,6 +1156,9 @@ class ShortCourse:
     production_sequence: Mapped[Optional[int]] = mapped_column(Integer, default=None)
     title_en: Mapped[Optional[str]] = mapped_column(String, default=None)
     year: Mapped[Optional[str]] = mapped_column(String, default=None)
+    year_: Mapped[Optional[int]] = mapped_column(
+        Integer, integer_year("year"), init=False
+    )
     country: Mapped[Optional[str]] = mapped_column(String, default=None)
     language: Mapped[Optional[str]] = mapped_column(String, default=None)
     dissemination_medium: Mapped[Optional[str]] = mapped_column(String, default=None)
@@ -1116,6 +1183,9 @@ class SocialMediaWebsiteBlog:
     production_sequence: Mapped[Optional[int]] = mapped_column(Integer, default=None)
     title_en: Mapped[Optional[str]] = mapped_column(String, default=None)
     year: Mapped[Optional[str]] = mapped_column(String, default=None)
+    year_: Mapped[Optional[int]] = mapped_column(
+        Integer, integer_year("year"), init=False
+    )
     country: Mapped[Optional[str]] = mapped_column(String, default=None)
     language: Mapped[Optional[str]] = mapped_column(String, default=None)
     dissemination_medium: Mapped[Optional[str]] = mapped_column(String, default=None)
@@ -1140,6 +1210,9 @@ class OtherTechnicalProduction:
     production_sequence: Mapped[Optional[int]] = mapped_column(Integer, default=None)
     title_en: Mapped[Optional[str]] = mapped_column(String, default=None)
     year: Mapped[Optional[str]] = mapped_column(String, default=None)
+    year_: Mapped[Optional[int]] = mapped_column(
+        Integer, integer_year("year"), init=False
+    )
     country: Mapped[Optional[str]] = mapped_column(String, default=None)
     language: Mapped[Optional[str]] = mapped_column(String, default=None)
     dissemination_medium: Mapped[Optional[str]] = mapped_column(String, default=None)
@@ -1173,6 +1246,8 @@ class Guidance:
         Integer, server_default=text("0"), default=0
     )
 
+    __table_args__ = (Index("ix_guidance_researcher_id", "researcher_id"),)
+
 
 @table_registry.mapped_as_dataclass
 class ParticipationEvents:
@@ -1239,6 +1314,7 @@ class OpenAlexResearcher:
     scopus: Mapped[Optional[str]] = mapped_column(String(255), default=None)
     orcid: Mapped[Optional[str]] = mapped_column(String(255), default=None)
     openalex: Mapped[Optional[str]] = mapped_column(String(255), default=None)
+    fetched_at: Mapped[Optional[datetime]] = mapped_column(default=None)
 
 
 @table_registry.mapped_as_dataclass
@@ -1257,3 +1333,5 @@ class RegisteredCultivar:
     year: Mapped[Optional[int]] = mapped_column(Integer, default=None)
     country: Mapped[Optional[str]] = mapped_column(String, default=None)
     code: Mapped[Optional[str]] = mapped_column(String, unique=True, default=None)
+
+    __table_args__ = (Index("ix_registered_cultivar_researcher_id", "researcher_id"),)
@@ -88,3 +88,36 @@ Critérios para Trajetória do Proponente em Tecnologias Sociais e Educacionais:
 - 7: Aderência com a área MÉDIA
 - 4: Aderência com a área BAIXA
 """
+
+
+PROMPT_CONDENSACAO = """
+Você receberá um trecho de um documento maior (trecho {indice} de {total}).
+Extraia, de forma descritiva e sem juízo de valor, todas as informações do trecho sobre:
+objetivos, metas, público alvo, produto, metodologia, gestão, equipe, parcerias, instituições colaboradoras,
+empresas, financiamentos, licenciamento, serviços, demandas, resultados, maturidade tecnológica,
+extensão, cartas de apoio, formação e histórico do proponente, indicadores e links.
+Preserve nomes, números, datas e valores exatamente como aparecem.
+
+Responda SOMENTE com um objeto JSON válido contendo exatamente a chave:
+"resumo" (string).
+
+Trecho:
+{texto}
+"""
+
+
+PROMPT_REPARO = """
+A resposta abaixo deveria ser um objeto JSON válido segundo o esquema, mas apresentou erros.
+Corrija apenas o necessário, preservando o conteúdo original.
+
+Responda SOMENTE com o objeto JSON corrigido.
+
+Esquema:
+{esquema}
+
+Erros:
+{erros}
+
+Resposta:
+{resposta}
+"""
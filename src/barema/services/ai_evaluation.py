@@ -1,24 +1,25 @@
 import os
 
 import polars as pl
-from langchain_community.document_loaders import PyMuPDFLoader
 from langchain_core.output_parsers import PydanticOutputParser
 from langchain_core.prompts import PromptTemplate
-from langchain_openai import ChatOpenAI
 from pydantic import BaseModel
-from tqdm import tqdm
 
-from barema.core.settings import Settings
-from barema.prompts import PROMPTS_AVALIACAO
-
-SETTINGS = Settings()
+from barema.prompts import INSTRUCAO_BASE, PROMPTS_AVALIACAO
+from barema.services.documents import (
+    ChunkSummary,
+    dispatch_batches,
+    fit_to_context,
+    prefetch_texts,
+    relevant_context,
+)
+from barema.services.llm import get_chat_model
+from barema.services.structured_output import report_failures, validate_responses
 
 CACHE_DIR = "data/raw/cache"
 CSV_PATH = os.path.join(CACHE_DIR, "project_analysis_cache.csv")
 XLSX_PATH = os.path.join(CACHE_DIR, "project_analysis_cache.xlsx")
 
-llm = ChatOpenAI(api_key=SETTINGS.OPENAI_API_KEY, model="gpt-5-nano", temperature=0)
-
 EXPECTED_KEYS = [
     "publico_produto",
     "objetivos_metas_relevancia",
@@ -46,6 +47,10 @@ class EvaluationResult(BaseModel):
     parecer_final: str
 
 
+def get_llm():
+    return get_chat_model("gpt-5-nano", schemas=(EvaluationResult, ChunkSummary))
+
+
 parser = PydanticOutputParser(pydantic_object=EvaluationResult)
 
 prompt_template = """
@@ -67,37 +72,52 @@ prompt = PromptTemplate(
     partial_variables={"format_instructions": parser.get_format_instructions()},
 )
 
-chain = prompt | llm | parser
-
 
-def _load_text_from_pdf(file_path: str) -> str:
-    loader = PyMuPDFLoader(file_path, mode="single")
-    documents = loader.load()
-    return "\n\n".join([doc.page_content for doc in documents])
+def criterios_texto() -> str:
+    return "\n".join(
+        [f"- {key}: {PROMPTS_AVALIACAO.get(key, 'Descreva')}" for key in EXPECTED_KEYS]
+    )
 
 
-def evaluation(lattes_id: str) -> dict:
-    file_path = f"data/raw/projects/{lattes_id}.pdf"
+def evaluate_documents(lattes_ids: list[str]) -> list[dict]:
+    llm = get_llm()
+    chain = prompt | llm
+    paths = {lid: f"data/raw/projects/{lid}.pdf" for lid in lattes_ids}
+    criterios = criterios_texto()
+    consultas = [
+        PROMPTS_AVALIACAO[key].replace(INSTRUCAO_BASE, "")
+        for key in EXPECTED_KEYS
+        if key in PROMPTS_AVALIACAO
+    ]
+
+    def prepared_inputs():
+        for lattes_id, text in fit_to_context(llm, prefetch_texts(paths)):
+            contexto = relevant_context(text, consultas)
+            yield lattes_id, {"criterios": criterios, "text": contexto}
+
+    respostas = dispatch_batches(chain, prepared_inputs())
+    parsed_results = validate_responses(llm, respostas, EvaluationResult, "avaliacao")
+    report_failures("avaliacao")
+
+    resultados = []
+    for lattes_id in lattes_ids:
+        if lattes_id in parsed_results and parsed_results[lattes_id] is None:
+            continue
+        # A PDF that exists but has no result failed to read; leaving it out
+        # of the cache lets the next run retry it.
+        if lattes_id not in parsed_results and os.path.exists(paths[lattes_id]):
+            continue
 
-    if not os.path.exists(file_path):
         resultado = {"lattes_id": lattes_id}
+        parsed = parsed_results.get(lattes_id)
         for key in EXPECTED_KEYS:
-            resultado[key] = "Relatório não encontrado"
-        return resultado
+            if parsed is None:
+                resultado[key] = "Relatório não encontrado"
+            else:
+                resultado[key] = getattr(parsed, key)
+        resultados.append(resultado)
 
-    text = _load_text_from_pdf(file_path)
-
-    criterios_texto = "\n".join(
-        [f"- {key}: {PROMPTS_AVALIACAO.get(key, 'Descreva')}" for key in EXPECTED_KEYS]
-    )
-
-    parsed = chain.invoke({"criterios": criterios_texto, "text": text})
-
-    resultado_final = {"lattes_id": lattes_id}
-    for key in EXPECTED_KEYS:
-        resultado_final[key] = getattr(parsed, key)
-
-    return resultado_final
+    return resultados
 
 
 def load_cache() -> pl.DataFrame:
@@ -125,11 +145,7 @@ def evaluate_projects(df_researchers: pl.DataFrame) -> pl.DataFrame:
     all_ids = df_researchers["lattes_id"].to_list()
 
     new_ids = [lid for lid in all_ids if lid not in cached_ids]
-    results = []
-
-    for lattes_id in tqdm(new_ids, desc="Analisando projetos"):
-        result = evaluation(lattes_id)
-        results.append(result)
+    results = evaluate_documents(new_ids)
 
     if results:
         schema = {"lattes_id": pl.Utf8}
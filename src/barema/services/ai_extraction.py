@@ -1,26 +1,23 @@
-import json
 import os
 
 import polars as pl
-from langchain_community.document_loaders import PyMuPDFLoader
 from langchain_core.messages import HumanMessage
-from langchain_openai import ChatOpenAI
-
-from barema.core.settings import Settings
-
-SETTINGS = Settings()
+from pydantic import BaseModel, field_validator
+
+from barema.services.documents import (
+    ChunkSummary,
+    dispatch_batches,
+    fit_to_context,
+    prefetch_texts,
+    relevant_context,
+)
+from barema.services.llm import get_chat_model
+from barema.services.structured_output import report_failures, validate_responses
 
 CACHE_DIR = "data/raw/cache"
 CSV_PATH = os.path.join(CACHE_DIR, "transfer_tech_cache.csv")
 XLSX_PATH = os.path.join(CACHE_DIR, "transfer_tech_cache.xlsx")
 
-llm = ChatOpenAI(
-    api_key=SETTINGS.OPENAI_API_KEY,
-    model="gpt-5-mini",
-    temperature=0,
-    model_kwargs={"response_format": {"type": "json_object"}},
-)
-
 CRITERIOS = {
     "licenciamento": "Licenciamento",
     "servicos": "Serviços",
@@ -28,12 +25,56 @@ CRITERIOS = {
     "demanda": "Demanda",
 }
 
+CONSULTAS = {
+    "licenciamento": "licenciamento licença patente registro propriedade intelectual "
+    "transferência de tecnologia royalties contrato",
+    "servicos": "serviços prestação consultoria assessoria análises laboratório "
+    "ensaios atendimento técnico",
+    "empresas": "empresa empresas parceria parceiros indústria startup cooperativa "
+    "associação organização convênio financiadora",
+    "demanda": "demanda necessidade problema setor produtivo mercado clientes "
+    "usuários comunidade sociedade",
+}
+
 
-def to_int(value):
-    try:
-        return int(value)
-    except (TypeError, ValueError):
-        return 0
+class TransferResult(BaseModel):
+    licenciamento_qtd: int = 0
+    licenciamento: str | None = None
+    servicos_qtd: int = 0
+    servicos: str | None = None
+    empresas_qtd: int = 0
+    empresas: str | None = None
+    demanda_qtd: int = 0
+    demanda: str | None = None
+
+    @field_validator(
+        "licenciamento_qtd",
+        "servicos_qtd",
+        "empresas_qtd",
+        "demanda_qtd",
+        mode="before",
+    )
+    @classmethod
+    def null_as_zero(cls, value):
+        return 0 if value is None else value
+
+
+class AttachmentResult(BaseModel):
+    carta_apoio: bool = False
+    comentarios_anexos: str | None = None
+
+    @field_validator("carta_apoio", mode="before")
+    @classmethod
+    def null_as_false(cls, value):
+        return False if value is None else value
+
+
+def get_llm():
+    return get_chat_model(
+        "gpt-5-mini",
+        json_mode=True,
+        schemas=(TransferResult, AttachmentResult, ChunkSummary),
+    )
 
 
 def gerar_prompt(chaves, texto):
@@ -85,13 +126,6 @@ Texto:
 """
 
 
-def _load_text_from_pdf(file_path: str) -> str:
-    loader = PyMuPDFLoader(file_path, mode="single")
-    documents = loader.load()
-    texts = [d.page_content for d in documents]
-    return "\n".join(texts)
-
-
 def load_cache() -> pl.DataFrame:
     if os.path.exists(CSV_PATH):
         return pl.read_csv(CSV_PATH, schema_overrides={"lattes_id": pl.Utf8})
@@ -131,93 +165,85 @@ def get_transfer_of_technology(df_researchers: pl.DataFrame) -> pl.DataFrame:
     if not new_ids:
         return df_researchers.join(cache, on="lattes_id", how="left")
 
-    inputs_gerais = []
-    lattes_validos = []
-    textos_cache = {}
-
+    paths = {}
     for lattes_id in new_ids:
-        file_path = f"data/raw/projects/{lattes_id}.pdf"
-        if os.path.exists(file_path):
-            text = _load_text_from_pdf(file_path)
-            textos_cache[lattes_id] = text
-            prompt = gerar_prompt(list(CRITERIOS.keys()), text)
-            inputs_gerais.append([HumanMessage(content=prompt)])
-            lattes_validos.append(lattes_id)
-
-    resultados_iniciais = {}
-    if inputs_gerais:
-        respostas_gerais = llm.batch(inputs_gerais)
-        for lattes_id, resposta in zip(lattes_validos, respostas_gerais):
-            try:
-                dados = json.loads(resposta.content)
-                for chave in CRITERIOS.keys():
-                    dados[f"{chave}_qtd"] = to_int(dados.get(f"{chave}_qtd"))
-                resultados_iniciais[lattes_id] = dados
-            except Exception:
-                resultados_iniciais[lattes_id] = {}
+        paths[("projeto", lattes_id)] = f"data/raw/projects/{lattes_id}.pdf"
+        paths[("anexo", lattes_id)] = f"data/raw/projects/attachment/{lattes_id}.pdf"
+
+    textos_cache = {}
+    llm = get_llm()
+
+    def prepared_prompts():
+        for (kind, lattes_id), text in fit_to_context(llm, prefetch_texts(paths)):
+            if kind == "projeto":
+                textos_cache[lattes_id] = text
+                contexto = relevant_context(text, CONSULTAS.values())
+                prompt = gerar_prompt(list(CRITERIOS.keys()), contexto)
+            else:
+                prompt = prompt_template_attachment.format(text=text)
+            yield (kind, lattes_id), [HumanMessage(content=prompt)]
+
+    respostas = dispatch_batches(llm, prepared_prompts())
+
+    respostas_gerais = {
+        lattes_id: resposta
+        for (kind, lattes_id), resposta in respostas.items()
+        if kind == "projeto"
+    }
+    respostas_anexos = {
+        lattes_id: resposta
+        for (kind, lattes_id), resposta in respostas.items()
+        if kind == "anexo"
+    }
+
+    resultados_iniciais = validate_responses(
+        llm, respostas_gerais, TransferResult, "transferencia"
+    )
+    resultados_anexos = validate_responses(
+        llm, respostas_anexos, AttachmentResult, "anexos"
+    )
 
     inputs_fallback = []
-    fallback_map = []
 
-    for lattes_id in lattes_validos:
-        dados = resultados_iniciais.get(lattes_id, {})
+    for lattes_id, dados in resultados_iniciais.items():
+        if dados is None:
+            continue
         text = textos_cache[lattes_id]
         for chave in CRITERIOS.keys():
-            if to_int(dados.get(f"{chave}_qtd")) == 0:
-                prompt = gerar_prompt([chave], text)
-                inputs_fallback.append([HumanMessage(content=prompt)])
-                fallback_map.append((lattes_id, chave))
-
-    if inputs_fallback:
-        respostas_fallback = llm.batch(inputs_fallback)
-        for (lattes_id, chave), resposta in zip(fallback_map, respostas_fallback):
-            try:
-                dados_fb = json.loads(resposta.content)
-                qtd_fb = to_int(dados_fb.get(f"{chave}_qtd"))
-                if qtd_fb > 0:
-                    resultados_iniciais[lattes_id][f"{chave}_qtd"] = qtd_fb
-                    resultados_iniciais[lattes_id][chave] = dados_fb.get(chave)
-            except Exception:
-                pass
-
-    inputs_anexos = []
-    lattes_anexos = []
+            if getattr(dados, f"{chave}_qtd") == 0:
+                contexto = relevant_context(text, [CONSULTAS[chave]])
+                prompt = gerar_prompt([chave], contexto)
+                mensagem = [HumanMessage(content=prompt)]
+                inputs_fallback.append(((lattes_id, chave), mensagem))
+
+    respostas_fallback = dispatch_batches(llm, inputs_fallback)
+    resultados_fallback = validate_responses(
+        llm, respostas_fallback, TransferResult, "transferencia_criterio"
+    )
 
-    for lattes_id in new_ids:
-        attachment_path = f"data/raw/projects/attachment/{lattes_id}.pdf"
-        if os.path.exists(attachment_path):
-            text = _load_text_from_pdf(attachment_path)
-            prompt = prompt_template_attachment.format(text=text)
-            inputs_anexos.append([HumanMessage(content=prompt)])
-            lattes_anexos.append(lattes_id)
-
-    resultados_anexos = {}
-    if inputs_anexos:
-        respostas_anexos = llm.batch(inputs_anexos)
-        for lattes_id, resposta in zip(lattes_anexos, respostas_anexos):
-            try:
-                resultados_anexos[lattes_id] = json.loads(resposta.content)
-            except Exception:
-                resultados_anexos[lattes_id] = {}
+    for (lattes_id, chave), dados_fb in resultados_fallback.items():
+        if dados_fb is None:
+            continue
+        qtd_fb = getattr(dados_fb, f"{chave}_qtd")
+        if qtd_fb > 0:
+            dados = resultados_iniciais[lattes_id]
+            setattr(dados, f"{chave}_qtd", qtd_fb)
+            setattr(dados, chave, getattr(dados_fb, chave))
+
+    for label in ("transferencia", "transferencia_criterio", "anexos"):
+        report_failures(label)
 
     results = []
     for lattes_id in new_ids:
-        dados_gerais = resultados_iniciais.get(lattes_id, {})
-        dados_anexos = resultados_anexos.get(lattes_id, {})
-
-        result = {
-            "lattes_id": lattes_id,
-            "licenciamento_qtd": to_int(dados_gerais.get("licenciamento_qtd")),
-            "licenciamento": dados_gerais.get("licenciamento"),
-            "servicos_qtd": to_int(dados_gerais.get("servicos_qtd")),
-            "servicos": dados_gerais.get("servicos"),
-            "empresas_qtd": to_int(dados_gerais.get("empresas_qtd")),
-            "empresas": dados_gerais.get("empresas"),
-            "demanda_qtd": to_int(dados_gerais.get("demanda_qtd")),
-            "demanda": dados_gerais.get("demanda"),
-            "carta_apoio": dados_anexos.get("carta_apoio", False),
-            "comentarios_anexos": dados_anexos.get("comentarios_anexos"),
-        }
+        dados_gerais = resultados_iniciais.get(lattes_id, TransferResult())
+        dados_anexos = resultados_anexos.get(lattes_id, AttachmentResult())
+
+        if dados_gerais is None or dados_anexos is None:
+            continue
+
+        result = {"lattes_id": lattes_id}
+        result.update(dados_gerais.model_dump())
+        result.update(dados_anexos.model_dump())
         results.append(result)
 
     if results:
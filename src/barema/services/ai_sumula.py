@@ -1,15 +1,18 @@
-import json
 import os
 
 import polars as pl
-from langchain_community.document_loaders import PyMuPDFLoader
 from langchain_core.messages import HumanMessage
-from langchain_openai import ChatOpenAI
+from pydantic import BaseModel
 
-from barema.core.settings import Settings
 from barema.prompts import PROMPT_BAREMA_NOVO
-
-SETTINGS = Settings()
+from barema.services.documents import (
+    ChunkSummary,
+    dispatch_batches,
+    fit_to_context,
+    prefetch_texts,
+)
+from barema.services.llm import get_chat_model
+from barema.services.structured_output import report_failures, validate_responses
 
 CACHE_DIR = "data/raw/cache"
 CSV_PATH = os.path.join(CACHE_DIR, "sumula_cache.csv")
@@ -26,12 +29,21 @@ CACHE_SCHEMA = {
     "trajetoria_proponente_observacao": pl.Utf8,
 }
 
-llm = ChatOpenAI(
-    api_key=SETTINGS.OPENAI_API_KEY,
-    model="gpt-5-nano",
-    temperature=0,
-    model_kwargs={"response_format": {"type": "json_object"}},
-)
+
+class SumulaResult(BaseModel):
+    sumula: str
+    transferencia_tecnologia_nota: int
+    transferencia_tecnologia_observacao: str
+    extensao_inovadora_nota: int
+    extensao_inovadora_observacao: str
+    trajetoria_proponente: int
+    trajetoria_proponente_observacao: str
+
+
+def get_llm():
+    return get_chat_model(
+        "gpt-5-nano", json_mode=True, schemas=(SumulaResult, ChunkSummary)
+    )
 
 
 def load_cache() -> pl.DataFrame:
@@ -47,15 +59,6 @@ def save_cache(df: pl.DataFrame):
     df.write_excel(XLSX_PATH)
 
 
-def load_document_content(lattes_id: str) -> str:
-    file_path = f"data/raw/projects/{lattes_id}.pdf"
-    if not os.path.exists(file_path):
-        return ""
-    loader = PyMuPDFLoader(file_path, mode="single")
-    documents = loader.load()
-    return "\n\n".join([doc.page_content for doc in documents])
-
-
 def analyze_sumula(researchers: pl.DataFrame) -> pl.DataFrame:
     cache = load_cache()
 
@@ -64,8 +67,6 @@ def analyze_sumula(researchers: pl.DataFrame) -> pl.DataFrame:
     new_ids = [l_id for l_id in all_ids if l_id not in cached_ids]
 
     results = []
-    inputs_gerais = []
-    lattes_validos = []
 
     default_response_template = {
         "sumula": "Não encontrado",
@@ -77,30 +78,36 @@ def analyze_sumula(researchers: pl.DataFrame) -> pl.DataFrame:
         "trajetoria_proponente_observacao": "Não encontrado",
     }
 
+    paths = {l_id: f"data/raw/projects/{l_id}.pdf" for l_id in new_ids}
+    llm = get_llm()
+    sem_texto = set()
+
+    def prepared_prompts():
+        for l_id, doc_content in fit_to_context(llm, prefetch_texts(paths)):
+            if doc_content:
+                mensagem = HumanMessage(
+                    content=f"{PROMPT_BAREMA_NOVO}\n\nDocumento: {doc_content}"
+                )
+                yield l_id, [mensagem]
+            else:
+                sem_texto.add(l_id)
+
+    respostas = dispatch_batches(llm, prepared_prompts())
+    validados = validate_responses(llm, respostas, SumulaResult, "sumula")
+    report_failures("sumula")
+
     for l_id in new_ids:
-        doc_content = load_document_content(l_id)
-        if doc_content:
-            mensagem = HumanMessage(
-                content=f"{PROMPT_BAREMA_NOVO}\n\nDocumento: {doc_content}"
-            )
-            inputs_gerais.append([mensagem])
-            lattes_validos.append(l_id)
-        else:
+        if l_id not in validados:
+            # Read failures are not cached so the next run retries them.
+            if os.path.exists(paths[l_id]) and l_id not in sem_texto:
+                continue
             default_data = default_response_template.copy()
             default_data["lattes_id"] = l_id
             results.append(default_data)
-
-    if inputs_gerais:
-        respostas = llm.batch(inputs_gerais)
-        for l_id, resposta in zip(lattes_validos, respostas):
-            try:
-                dados = json.loads(resposta.content)
-                dados["lattes_id"] = l_id
-                results.append(dados)
-            except Exception:
-                error_data = default_response_template.copy()
-                error_data["lattes_id"] = l_id
-                results.append(error_data)
+        elif validados[l_id] is not None:
+            dados = validados[l_id].model_dump()
+            dados["lattes_id"] = l_id
+            results.append(dados)
 
     if results:
         df_new = pl.DataFrame(results, schema=CACHE_SCHEMA)
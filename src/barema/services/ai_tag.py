@@ -2,21 +2,20 @@ import os
 
 import polars as pl
 from langchain_core.messages import HumanMessage
-from langchain_openai import ChatOpenAI
 from tqdm import tqdm
 
-from barema.core.settings import Settings
-
-SETTINGS = Settings()
+from barema.services.llm import get_chat_model
 
 CACHE_DIR = "data/raw/cache"
 CSV_PATH = os.path.join(CACHE_DIR, "agencies_cache.csv")
 XLSX_PATH = os.path.join(CACHE_DIR, "agencies_cache.xlsx")
 
 
-def evaluate_agency(agency_name: str) -> bool:
-    llm = ChatOpenAI(api_key=SETTINGS.OPENAI_API_KEY, model="gpt-5-nano", temperature=0)
+def get_llm():
+    return get_chat_model("gpt-5-nano")
 
+
+def evaluate_agency(agency_name: str) -> bool:
     prompt = (
         "Estou classificando projetos acadêmicos segundo critérios de avaliação (barema). "
         "Preciso identificar se o financiador caracteriza um projeto com empresa ou organização externa ao setor acadêmico/público. "
@@ -29,7 +28,7 @@ def evaluate_agency(agency_name: str) -> bool:
         "Responda apenas 'True' ou 'False'."
     )
 
-    resposta = llm.invoke([HumanMessage(content=prompt)])
+    resposta = get_llm().invoke([HumanMessage(content=prompt)])
     return resposta.content.strip().lower() == "true"
 
 
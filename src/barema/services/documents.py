@@ -0,0 +1,257 @@
+import math
+import os
+import re
+import unicodedata
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+from langchain_community.document_loaders import PyMuPDFLoader
+from langchain_core.messages import HumanMessage
+from pydantic import BaseModel
+
+from barema.prompts import PROMPT_CONDENSACAO
+from barema.services.structured_output import report_failures, validate_responses
+
+LLM_BATCH_SIZE = 16
+LLM_MAX_CONCURRENT_BATCHES = 4
+
+MAX_DOCUMENT_TOKENS = 60_000
+CHUNK_TOKENS = 8_000
+MAX_REDUCE_ROUNDS = 3
+
+PASSAGE_CHARS = 1500
+TOP_PASSAGES = 4
+HEADING_PATTERN = re.compile(
+    r"^\s*(?:\d+(?:\.\d+)*[.)]?\s+)?[A-ZÀ-Ý][A-ZÀ-Ý0-9 ,/()\-]{3,80}:?\s*$"
+)
+WORD_PATTERN = re.compile(r"\w{3,}")
+
+
+def load_text_from_pdf(file_path: str) -> str:
+    loader = PyMuPDFLoader(file_path, mode="single")
+    documents = loader.load()
+    return "\n\n".join([doc.page_content for doc in documents])
+
+
+def prefetch_texts(paths: dict, max_workers: int | None = None):
+    existing = {key: path for key, path in paths.items() if os.path.exists(path)}
+    if not existing:
+        return
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(load_text_from_pdf, path): key
+            for key, path in existing.items()
+        }
+        for future in as_completed(futures):
+            key = futures[future]
+            try:
+                text = future.result()
+            except Exception as e:
+                print(f"[Erro] Falha ao ler {existing[key]}: {e}")
+                continue
+            yield key, text
+
+
+def _batch(runnable, chunk):
+    return runnable.batch(chunk, return_exceptions=True)
+
+
+def dispatch_batches(
+    runnable,
+    inputs,
+    batch_size: int = LLM_BATCH_SIZE,
+    max_workers: int = LLM_MAX_CONCURRENT_BATCHES,
+) -> dict:
+    pending = []
+    keys, chunk = [], []
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for key, value in inputs:
+            keys.append(key)
+            chunk.append(value)
+
+            if len(chunk) >= batch_size:
+                pending.append((keys, executor.submit(_batch, runnable, chunk)))
+                keys, chunk = [], []
+
+        if chunk:
+            pending.append((keys, executor.submit(_batch, runnable, chunk)))
+
+        results = {}
+        for keys, future in pending:
+            try:
+                results.update(zip(keys, future.result()))
+            except Exception as e:
+                results.update((key, e) for key in keys)
+
+    return results
+
+
+def count_tokens(llm, text: str) -> int:
+    return llm.get_num_tokens(text)
+
+
+def split_into_chunks(
+    text: str, total_tokens: int, chunk_tokens: int = CHUNK_TOKENS
+) -> list[str]:
+    chars_per_chunk = max(1, int(len(text) * chunk_tokens / max(total_tokens, 1)))
+    chunks = []
+    start = 0
+
+    while start < len(text):
+        end = min(len(text), start + chars_per_chunk)
+        if end < len(text):
+            newline = text.rfind("\n", start + chars_per_chunk // 2, end)
+            if newline != -1:
+                end = newline + 1
+        chunks.append(text[start:end])
+        start = end
+
+    return chunks
+
+
+class ChunkSummary(BaseModel):
+    resumo: str = ""
+
+
+def condense_documents(llm, texts: dict) -> dict:
+    pending = {key: (text, count_tokens(llm, text)) for key, text in texts.items()}
+    condensed = {}
+
+    for _ in range(MAX_REDUCE_ROUNDS):
+        chunks = {}
+        for key, (text, tokens) in pending.items():
+            parts = split_into_chunks(text, tokens)
+            for index, part in enumerate(parts):
+                prompt = PROMPT_CONDENSACAO.format(
+                    indice=index + 1, total=len(parts), texto=part
+                )
+                chunks[(key, index)] = [HumanMessage(content=prompt)]
+
+        respostas = dispatch_batches(llm, chunks.items())
+        resumos = validate_responses(llm, respostas, ChunkSummary, "condensacao")
+
+        reduced = {}
+        for key, index in sorted(chunks, key=lambda k: k[1]):
+            resumo = resumos.get((key, index))
+            reduced.setdefault(key, []).append(resumo.resumo if resumo else "")
+
+        pending = {}
+        for key, resumos in reduced.items():
+            text = "\n\n".join(resumos)
+            tokens = count_tokens(llm, text)
+            if tokens > MAX_DOCUMENT_TOKENS:
+                pending[key] = (text, tokens)
+            else:
+                condensed[key] = text
+
+        if not pending:
+            break
+
+    for key, (text, _) in pending.items():
+        condensed[key] = text
+
+    report_failures("condensacao")
+    return condensed
+
+
+def fit_to_context(llm, texts):
+    oversized = {}
+
+    for key, text in texts:
+        if count_tokens(llm, text) > MAX_DOCUMENT_TOKENS:
+            oversized[key] = text
+        else:
+            yield key, text
+
+    if oversized:
+        yield from condense_documents(llm, oversized).items()
+
+
+def split_sections(text: str) -> list[str]:
+    sections = []
+    heading, lines = "", []
+
+    for line in text.splitlines():
+        if HEADING_PATTERN.match(line):
+            if lines:
+                sections.append((heading, lines))
+            heading, lines = line.strip(), []
+        else:
+            lines.append(line)
+
+    if lines:
+        sections.append((heading, lines))
+
+    passages = []
+    for heading, lines in sections:
+        current = ""
+        for line in lines:
+            if current and len(current) + len(line) > PASSAGE_CHARS:
+                passages.append(f"{heading}\n{current}".strip())
+                current = ""
+            current += line + "\n"
+        if current.strip():
+            passages.append(f"{heading}\n{current}".strip())
+
+    return passages
+
+
+def tokenize(text: str) -> list[str]:
+    normalized = unicodedata.normalize("NFKD", text.lower())
+    normalized = "".join(c for c in normalized if not unicodedata.combining(c))
+    return WORD_PATTERN.findall(normalized)
+
+
+class BM25:
+    def __init__(self, passages: list[str], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.frequencies = [Counter(tokenize(passage)) for passage in passages]
+        self.lengths = [sum(freq.values()) for freq in self.frequencies]
+        self.average_length = sum(self.lengths) / max(len(self.lengths), 1)
+
+        document_frequency = Counter()
+        for freq in self.frequencies:
+            document_frequency.update(freq.keys())
+
+        total = len(passages)
+        self.idf = {
+            term: math.log(1 + (total - count + 0.5) / (count + 0.5))
+            for term, count in document_frequency.items()
+        }
+
+    def scores(self, query: str) -> list[float]:
+        terms = set(tokenize(query))
+        scores = []
+
+        for freq, length in zip(self.frequencies, self.lengths):
+            norm = self.k1 * (1 - self.b + self.b * length / (self.average_length or 1))
+            score = 0.0
+            for term in terms:
+                tf = freq.get(term)
+                if tf:
+                    score += self.idf[term] * tf * (self.k1 + 1) / (tf + norm)
+            scores.append(score)
+
+        return scores
+
+
+def relevant_context(text: str, queries, top_k: int = TOP_PASSAGES) -> str:
+    passages = split_sections(text)
+    if len(passages) <= top_k:
+        return text
+
+    bm25 = BM25(passages)
+    selected = set()
+
+    for query in queries:
+        scores = bm25.scores(query)
+        ranked = sorted(range(len(passages)), key=scores.__getitem__, reverse=True)
+        selected.update(i for i in ranked[:top_k] if scores[i] > 0)
+
+    if not selected:
+        return text
+
+    return "\n\n[...]\n\n".join(passages[i] for i in sorted(selected))
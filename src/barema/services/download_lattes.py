@@ -1,4 +1,11 @@
+import hashlib
+import hmac
+import io
+import os
+import shutil
+import time
 import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
 import httpx
@@ -6,6 +13,8 @@ import polars as pl
 import urllib3
 from tqdm import tqdm
 
+from barema.core.settings import get_settings
+
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 BASE_DIR = Path(__file__).resolve().parent.parent.parent.parent
@@ -13,35 +22,138 @@ RAW_DATA_PATH = BASE_DIR / "data" / "raw" / "lattes"
 PROXY_URL = "https://simcc.uesc.br/v3/api/getCurriculoCompactado"
 IDENTIFICADOR_URL = "https://simcc.uesc.br/v3/api/getIdentificadorCNPq"
 
+CACHE_DIR = "data/raw/cache"
+LATTES_ID_CACHE_PATH = os.path.join(CACHE_DIR, "lattes_id_cache_hmac.csv")
+LATTES_ID_CACHE_SCHEMA = {"cpf_hmac": pl.Utf8, "lattes_id": pl.Utf8}
+
+MAX_WORKERS = 8
+MAX_RETRIES = 3
+RETRY_BACKOFF = 2.0
+
+
+class LookupFailed(Exception):
+    pass
+
+
+def clean_cpf(cpf: str) -> str:
+    return "".join(filter(str.isdigit, cpf or ""))
+
+
+def hash_cpf(cpf: str) -> str | None:
+    cpf_clean = clean_cpf(cpf)
+    if not cpf_clean:
+        return None
+
+    key = get_settings().CPF_HASH_KEY
+    if not key:
+        raise RuntimeError("CPF_HASH_KEY não configurada.")
+    return hmac.new(key.encode(), cpf_clean.encode(), hashlib.sha256).hexdigest()
+
 
 def get_lattes_id(cpf: str, http_client: httpx.Client) -> str | None:
-    cpf_clean = "".join(filter(str.isdigit, cpf))
+    cpf_clean = clean_cpf(cpf)
 
-    response = http_client.get(
-        IDENTIFICADOR_URL,
-        params={"cpf": cpf_clean, "nomeCompleto": "", "dataNascimento": ""},
-    )
+    for attempt in range(MAX_RETRIES):
+        try:
+            response = http_client.get(
+                IDENTIFICADOR_URL,
+                params={"cpf": cpf_clean, "nomeCompleto": "", "dataNascimento": ""},
+            )
+        except httpx.TransportError as e:
+            error = e
+        else:
+            if response.status_code == 200:
+                return response.text.strip() or None
+            if response.status_code == 404:
+                return None
+            error = f"Status {response.status_code}"
 
-    if response.status_code == 200 and response.text:
-        return response.text.strip()
-    return None
+        if attempt < MAX_RETRIES - 1:
+            time.sleep(RETRY_BACKOFF * (attempt + 1))
 
+    raise LookupFailed(f"Falha após {MAX_RETRIES} tentativas: {error}")
 
-def add_lattes_id(df: pl.DataFrame) -> pl.DataFrame:
-    with httpx.Client(timeout=30.0, verify=False) as http_client:
-        ids = []
 
-        for row in tqdm(
-            df.iter_rows(named=True), total=df.height, desc="Buscando Lattes ID"
-        ):
-            cpf = row["CPF"]
-            try:
-                lattes_id = get_lattes_id(cpf, http_client)
-                ids.append(lattes_id)
-            except Exception:
-                ids.append(None)
+def load_lattes_id_cache() -> dict[str, str | None]:
+    if not os.path.exists(LATTES_ID_CACHE_PATH):
+        return {}
 
-    return df.with_columns(pl.Series("lattes_id", ids))
+    cache = pl.read_csv(LATTES_ID_CACHE_PATH, schema=LATTES_ID_CACHE_SCHEMA)
+    return dict(cache.iter_rows())
+
+
+def save_lattes_id_cache(cache: dict[str, str | None]):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    df = pl.DataFrame(list(cache.items()), schema=LATTES_ID_CACHE_SCHEMA, orient="row")
+    df.write_csv(LATTES_ID_CACHE_PATH)
+
+
+def add_lattes_id(df: pl.DataFrame) -> pl.DataFrame:
+    cache = load_lattes_id_cache()
+    hashes = [hash_cpf(cpf) for cpf in df["CPF"].to_list()]
+    cpfs = {
+        h: cpf
+        for h, cpf in zip(hashes, df["CPF"].to_list())
+        if h is not None and h not in cache
+    }
+    failed = 0
+
+    if cpfs:
+        with (
+            httpx.Client(timeout=30.0, verify=False) as http_client,
+            ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor,
+        ):
+            futures = {
+                executor.submit(get_lattes_id, cpf, http_client): cpf_hash
+                for cpf_hash, cpf in cpfs.items()
+            }
+
+            for future in tqdm(
+                as_completed(futures), total=len(futures), desc="Buscando Lattes ID"
+            ):
+                try:
+                    cache[futures[future]] = future.result()
+                except LookupFailed:
+                    failed += 1
+
+        save_lattes_id_cache(cache)
+
+    if failed:
+        print(
+            f"[Aviso] {failed} CPF(s) não puderam ser consultados e serão "
+            "tentados novamente na próxima execução."
+        )
+
+    ids = [cache.get(cpf_hash) if cpf_hash else None for cpf_hash in hashes]
+    return df.with_columns(pl.Series("lattes_id", ids, dtype=pl.Utf8))
+
+
+def extract_lattes_xml(lattes_id: str, content: bytes) -> Path:
+    with zipfile.ZipFile(io.BytesIO(content)) as z:
+        members = [
+            info
+            for info in z.infolist()
+            if not info.is_dir() and info.filename.lower().endswith(".xml")
+        ]
+
+        if len(members) != 1:
+            raise ValueError(
+                f"Arquivo compactado deveria conter um XML, encontrados {len(members)}."
+            )
+
+        member = members[0]
+        xml_path = RAW_DATA_PATH / f"{lattes_id}.xml"
+        tmp_path = xml_path.with_suffix(".xml.tmp")
+
+        try:
+            with z.open(member) as source, open(tmp_path, "wb") as target:
+                shutil.copyfileobj(source, target)
+        except Exception:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+    tmp_path.replace(xml_path)
+    return xml_path
 
 
 def download_and_extract(lattes_id: str, http_client: httpx.Client) -> None:
@@ -52,15 +164,10 @@ def download_and_extract(lattes_id: str, http_client: httpx.Client) -> None:
     if not content:
         raise ValueError("Conteúdo retornado sem dados.")
 
-    zip_path = RAW_DATA_PATH / f"{lattes_id}.zip"
-
-    with open(zip_path, "wb") as f:
-        f.write(content)
-
-    with zipfile.ZipFile(zip_path, "r") as z:
-        z.extractall(RAW_DATA_PATH)
+    if not zipfile.is_zipfile(io.BytesIO(content)):
+        raise ValueError("Conteúdo retornado não é um arquivo ZIP válido.")
 
-    zip_path.unlink(missing_ok=True)
+    extract_lattes_xml(lattes_id, content)
 
 
 def download_lattes_xml(df: pl.DataFrame):
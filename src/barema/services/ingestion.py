@@ -0,0 +1,415 @@
+import hashlib
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from tempfile import SpooledTemporaryFile
+
+from tqdm import tqdm
+
+from barema.db.connection import get_engine
+from barema.services.lattes_parser import (
+    OWNED_TABLES,
+    ROW_TYPES,
+    parse_lattes,
+    read_last_update,
+)
+
+LATTES_PATH = Path("data/raw/lattes")
+MAX_WORKERS = 4
+SPOOL_MAX_SIZE = 4 * 1024 * 1024
+
+# Parents before children, so the foreign keys hold while copying.
+COPY_ORDER = [
+    "education",
+    "bibliographic_production",
+    "bibliographic_production_article",
+    "bibliographic_production_book",
+    "bibliographic_production_book_chapter",
+    "software",
+    "patent",
+    "industrial_design",
+    "brand",
+    "research_report",
+    "guidance",
+    "research_project",
+    "research_project_components",
+    "research_project_foment",
+]
+
+# Child tables of each record and the column pointing at the parent row. The
+# Hop-only children are listed so a stale record is removed in full.
+RECORD_CHILDREN = {
+    "bibliographic_production": {
+        "bibliographic_production_article": "bibliographic_production_id",
+        "bibliographic_production_book": "bibliographic_production_id",
+        "bibliographic_production_book_chapter": "bibliographic_production_id",
+        "bibliographic_production_work_in_event": "bibliographic_production_id",
+    },
+    "research_project": {
+        "research_project_components": "project_id",
+        "research_project_foment": "project_id",
+        "research_project_production": "project_id",
+    },
+}
+PARENT_TABLES = {
+    child: parent for parent, children in RECORD_CHILDREN.items() for child in children
+}
+KEY_EXCLUDED = {"id", "bibliographic_production_id", "project_id", "year_"}
+
+IS_NEW_TABLES = {
+    "bibliographic_production",
+    "software",
+    "patent",
+    "brand",
+    "research_report",
+    "guidance",
+}
+
+COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+DELETE_RESEARCHER_ROWS = [
+    """
+    DELETE FROM bibliographic_production_article WHERE bibliographic_production_id
+        IN (SELECT id FROM bibliographic_production WHERE researcher_id = %(id)s)
+    """,
+    """
+    DELETE FROM bibliographic_production_book WHERE bibliographic_production_id
+        IN (SELECT id FROM bibliographic_production WHERE researcher_id = %(id)s)
+    """,
+    """
+    DELETE FROM bibliographic_production_book_chapter WHERE bibliographic_production_id
+        IN (SELECT id FROM bibliographic_production WHERE researcher_id = %(id)s)
+    """,
+    """
+    DELETE FROM bibliographic_production_work_in_event WHERE bibliographic_production_id
+        IN (SELECT id FROM bibliographic_production WHERE researcher_id = %(id)s)
+    """,
+    "DELETE FROM bibliographic_production WHERE researcher_id = %(id)s",
+    """
+    DELETE FROM research_project_components WHERE project_id
+        IN (SELECT id FROM research_project WHERE researcher_id = %(id)s)
+    """,
+    """
+    DELETE FROM research_project_foment WHERE project_id
+        IN (SELECT id FROM research_project WHERE researcher_id = %(id)s)
+    """,
+    """
+    DELETE FROM research_project_production WHERE project_id
+        IN (SELECT id FROM research_project WHERE researcher_id = %(id)s)
+    """,
+    "DELETE FROM research_project WHERE researcher_id = %(id)s",
+    "DELETE FROM education WHERE researcher_id = %(id)s",
+    "DELETE FROM software WHERE researcher_id = %(id)s",
+    "DELETE FROM patent WHERE researcher_id = %(id)s",
+    "DELETE FROM registered_cultivar WHERE researcher_id = %(id)s",
+    "DELETE FROM industrial_design WHERE researcher_id = %(id)s",
+    "DELETE FROM brand WHERE researcher_id = %(id)s",
+    "DELETE FROM research_report WHERE researcher_id = %(id)s",
+    "DELETE FROM guidance WHERE researcher_id = %(id)s",
+]
+
+
+UPSERT_RESEARCHER = """
+INSERT INTO researcher (name, lattes_id, citations, orcid, abstract, abstract_en,
+    last_update)
+VALUES (%(name)s, %(lattes_id)s, %(citations)s, %(orcid)s, %(abstract)s,
+    %(abstract_en)s, COALESCE(%(last_update)s, NOW()))
+ON CONFLICT (lattes_id) DO UPDATE SET
+    name = EXCLUDED.name,
+    citations = EXCLUDED.citations,
+    orcid = EXCLUDED.orcid,
+    abstract = EXCLUDED.abstract,
+    abstract_en = EXCLUDED.abstract_en,
+    last_update = EXCLUDED.last_update
+RETURNING id
+"""
+
+CULTIVAR_COLUMNS = ["researcher_id", *ROW_TYPES["registered_cultivar"]._fields]
+
+# registered_cultivar.code is unique across researchers, so it is inserted
+# row by row and duplicates are skipped instead of aborting the COPY.
+INSERT_CULTIVAR = f"""
+INSERT INTO registered_cultivar ({", ".join(CULTIVAR_COLUMNS)})
+VALUES ({", ".join(f"%({c})s" for c in CULTIVAR_COLUMNS)})
+ON CONFLICT (code) DO NOTHING
+"""
+
+SELECT_LAST_UPDATE = """
+SELECT id, last_update FROM researcher WHERE lattes_id = %(lattes_id)s
+"""
+
+periodicals_by_issn = {}
+
+
+def normalize_issn(value):
+    value = value.strip() if value else None
+    return value.replace("-", "").upper() if value else None
+
+
+def copy_columns(table, mark_new=False):
+    columns = list(ROW_TYPES[table]._fields)
+    if mark_new and table in IS_NEW_TABLES:
+        columns.insert(0, "is_new")
+    if table in OWNED_TABLES:
+        columns.insert(0, "researcher_id")
+    return columns
+
+
+def copy_value(value):
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    return str(value).translate(COPY_ESCAPES)
+
+
+class TableSpool:
+    def __init__(self):
+        self.files = {}
+        self.counts = dict.fromkeys(COPY_ORDER, 0)
+
+    def write(self, table, row):
+        spool = self.files.get(table)
+        if spool is None:
+            spool = SpooledTemporaryFile(
+                max_size=SPOOL_MAX_SIZE, mode="w+", encoding="utf-8"
+            )
+            self.files[table] = spool
+        spool.write("\t".join(copy_value(value) for value in row) + "\n")
+        self.counts[table] += 1
+
+    def copy(self, cursor, table, researcher_id, mark_new=False):
+        spool = self.files.get(table)
+        if spool is None:
+            return
+
+        prefix = f"{researcher_id}\t" if table in OWNED_TABLES else ""
+        if mark_new and table in IS_NEW_TABLES:
+            prefix += "t\t"
+        spool.seek(0)
+        columns = ", ".join(copy_columns(table, mark_new))
+        statement = f"COPY {table} ({columns}) FROM STDIN"
+        with cursor.copy(statement) as copy:
+            for line in spool:
+                copy.write(prefix + line)
+
+    def close(self):
+        for spool in self.files.values():
+            spool.close()
+
+
+def resolve_row(table, row):
+    if table != "bibliographic_production_article":
+        return row
+    periodical_id = periodicals_by_issn.get(normalize_issn(row.issn))
+    if periodical_id is None:
+        return None
+    return row._replace(periodical_magazine_id=periodical_id)
+
+
+def parse_records(path: Path):
+    record = None
+    for table, row in parse_lattes(path):
+        row = resolve_row(table, row)
+        if row is None:
+            continue
+        if table in PARENT_TABLES:
+            record[2].append((table, row))
+            continue
+        if record is not None:
+            yield record
+        record = (table, row, [])
+    if record is not None:
+        yield record
+
+
+def row_text(row):
+    return "\t".join(
+        copy_value(value)
+        for field, value in zip(row._fields, row)
+        if field not in KEY_EXCLUDED
+    )
+
+
+def record_key(table, row, children):
+    digest = hashlib.sha1(f"{table}\t{row_text(row)}".encode())
+    for child in sorted(f"{t}\t{row_text(r)}" for t, r in children):
+        digest.update(b"\n" + child.encode())
+    return digest.hexdigest()
+
+
+def existing_records(cursor, researcher_id):
+    records = defaultdict(list)
+    for table in OWNED_TABLES:
+        row_type = ROW_TYPES[table]
+        cursor.execute(
+            f"SELECT {', '.join(row_type._fields)} FROM {table} "
+            "WHERE researcher_id = %(id)s",
+            {"id": researcher_id},
+        )
+        rows = [row_type._make(row) for row in cursor]
+
+        children = defaultdict(list)
+        for child, column in RECORD_CHILDREN.get(table, {}).items():
+            if child not in ROW_TYPES:
+                continue
+            cursor.execute(
+                f"SELECT {', '.join(ROW_TYPES[child]._fields)} FROM {child} "
+                f"WHERE {column} IN "
+                f"(SELECT id FROM {table} WHERE researcher_id = %(id)s)",
+                {"id": researcher_id},
+            )
+            for values in cursor:
+                row = ROW_TYPES[child]._make(values)
+                children[getattr(row, column)].append((child, row))
+
+        for row in rows:
+            key = record_key(table, row, children[row.id])
+            records[(table, key)].append(row.id)
+    return records
+
+
+def delete_records(cursor, stale):
+    for table, ids in stale.items():
+        for child, column in RECORD_CHILDREN.get(table, {}).items():
+            cursor.execute(
+                f"DELETE FROM {child} WHERE {column} = ANY(%(ids)s)", {"ids": ids}
+            )
+        cursor.execute(f"DELETE FROM {table} WHERE id = ANY(%(ids)s)", {"ids": ids})
+
+
+def spool_curriculum(path: Path, spool: TableSpool, existing=None):
+    researcher, cultivars = None, []
+
+    for table, row, children in parse_records(path):
+        if table == "researcher":
+            researcher = row._asdict()
+            continue
+
+        if existing is not None:
+            unchanged = existing.get((table, record_key(table, row, children)))
+            if unchanged:
+                unchanged.pop()
+                continue
+
+        if table == "registered_cultivar":
+            cultivars.append(row._asdict())
+        else:
+            spool.write(table, row)
+        for child, child_row in children:
+            spool.write(child, child_row)
+
+    if researcher is None:
+        raise ValueError("DADOS-GERAIS ausente")
+    return researcher, cultivars
+
+
+def load_curriculum(path: Path, delta: bool = False) -> tuple[int, int] | None:
+    spool = TableSpool()
+    connection = get_engine().raw_connection()
+    try:
+        with connection.driver_connection.cursor() as cursor:
+            existing = None
+            if delta:
+                cursor.execute(SELECT_LAST_UPDATE, {"lattes_id": path.stem})
+                found = cursor.fetchone()
+                last_update = read_last_update(path)
+                if found and found[1] and last_update and found[1] >= last_update:
+                    connection.rollback()
+                    return None
+                existing = existing_records(cursor, found[0]) if found else {}
+
+            researcher, cultivars = spool_curriculum(path, spool, existing)
+
+            cursor.execute(UPSERT_RESEARCHER, researcher)
+            researcher_id = cursor.fetchone()[0]
+
+            deleted = 0
+            if existing is None:
+                for statement in DELETE_RESEARCHER_ROWS:
+                    cursor.execute(statement, {"id": researcher_id})
+            else:
+                stale = defaultdict(list)
+                for (table, _), ids in existing.items():
+                    stale[table].extend(ids)
+                delete_records(cursor, {t: ids for t, ids in stale.items() if ids})
+                deleted = sum(len(ids) for ids in stale.values())
+
+                for table in IS_NEW_TABLES:
+                    if spool.counts[table]:
+                        cursor.execute(
+                            f"UPDATE {table} SET is_new = false "
+                            "WHERE researcher_id = %(id)s AND is_new",
+                            {"id": researcher_id},
+                        )
+
+            for table in COPY_ORDER:
+                spool.copy(cursor, table, researcher_id, mark_new=delta)
+
+            for row in cultivars:
+                cursor.execute(INSERT_CULTIVAR, {**row, "researcher_id": researcher_id})
+
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        connection.close()
+        spool.close()
+
+    return sum(spool.counts.values()) + len(cultivars), deleted
+
+
+def init_worker():
+    get_engine().dispose(close=False)
+
+    connection = get_engine().raw_connection()
+    try:
+        with connection.driver_connection.cursor() as cursor:
+            cursor.execute("SELECT id, issn FROM periodical_magazine")
+            for periodical_id, issn in cursor:
+                issn = normalize_issn(issn)
+                if issn:
+                    periodicals_by_issn.setdefault(issn, periodical_id)
+        connection.commit()
+    finally:
+        connection.close()
+
+
+def ingest_lattes(
+    folder: Path = LATTES_PATH, max_workers: int = MAX_WORKERS, delta: bool = False
+) -> tuple[int, int]:
+    paths = sorted(Path(folder).glob("*.xml"))
+    if not paths:
+        print(f"Nenhum XML encontrado em {folder}")
+        return 0, 0
+
+    max_workers = min(max_workers, len(paths), os.cpu_count() or 1)
+    loaded, skipped, failed, inserted, deleted = 0, 0, 0, 0, 0
+
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=init_worker) as ex:
+        futures = {ex.submit(load_curriculum, path, delta): path for path in paths}
+        for future in tqdm(
+            as_completed(futures), total=len(futures), desc="Carregando Lattes"
+        ):
+            try:
+                result = future.result()
+            except Exception as e:
+                failed += 1
+                print(f"\n[Erro] Falha ao carregar {futures[future].name}: {e}")
+                continue
+
+            if result is None:
+                skipped += 1
+                continue
+            loaded += 1
+            inserted += result[0]
+            deleted += result[1]
+
+    print(
+        f"{loaded} currículo(s) carregado(s), {skipped} inalterado(s), "
+        f"{failed} falha(s); {inserted} linha(s) inserida(s), "
+        f"{deleted} removida(s)"
+    )
+    return inserted + deleted, failed
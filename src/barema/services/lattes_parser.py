@@ -0,0 +1,644 @@
+import uuid
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, NamedTuple
+from uuid import UUID
+
+
+class ResearcherRow(NamedTuple):
+    lattes_id: str
+    name: str
+    citations: str | None
+    orcid: str | None
+    abstract: str | None
+    abstract_en: str | None
+    last_update: datetime | None
+
+
+class EducationRow(NamedTuple):
+    id: UUID
+    degree: str
+    education_name: str | None
+    education_start: int | None
+    education_end: int | None
+    institution: str | None
+    status: str | None
+
+
+class ProductionRow(NamedTuple):
+    id: UUID
+    title: str
+    type: str
+    title_en: str | None
+    doi: str | None
+    nature: str | None
+    year: str | None
+    year_: int | None
+    language: str | None
+    means_divulgation: str | None
+    homepage: str | None
+    relevance: bool
+    scientific_divulgation: bool
+    authors: str
+
+
+class ArticleRow(NamedTuple):
+    id: UUID
+    bibliographic_production_id: UUID
+    volume: str | None
+    fascicle: str | None
+    series: str | None
+    start_page: str | None
+    end_page: str | None
+    place_publication: str | None
+    periodical_magazine_name: str | None
+    issn: str | None
+    periodical_magazine_id: UUID | None = None
+
+
+class BookRow(NamedTuple):
+    id: UUID
+    bibliographic_production_id: UUID
+    isbn: str | None
+    qtt_volume: str | None
+    qtt_pages: str | None
+    num_edition_revision: str | None
+    num_series: str | None
+    publishing_company: str | None
+    publishing_company_city: str | None
+
+
+class BookChapterRow(NamedTuple):
+    id: UUID
+    bibliographic_production_id: UUID
+    book_title: str | None
+    isbn: str | None
+    start_page: str | None
+    end_page: str | None
+    qtt_volume: str | None
+    organizers: str | None
+    num_edition_revision: str | None
+    num_series: str | None
+    publishing_company: str | None
+    publishing_company_city: str | None
+
+
+class SoftwareRow(NamedTuple):
+    id: UUID
+    title: str | None
+    platform: str | None
+    goal: str | None
+    relevance: bool
+    environment: str | None
+    availability: str | None
+    financing_institutionc: str | None
+    year: int | None
+    code: str | None
+
+
+class PatentRow(NamedTuple):
+    id: UUID
+    title: str | None
+    category: str | None
+    relevance: bool
+    development_year: str | None
+    details: str | None
+    code: str | None
+    grant_date: datetime | None
+    deposit_date: str | None
+
+
+class CultivarRow(NamedTuple):
+    id: UUID
+    denomination: str | None
+    denomination_en: str | None
+    year: int | None
+    country: str | None
+    code: str | None
+
+
+class IndustrialDesignRow(NamedTuple):
+    id: UUID
+    title: str
+    production_sequence: int | None
+    title_en: str | None
+    year: str | None
+    country: str | None
+    language: str | None
+    dissemination_medium: str | None
+    homepage: str | None
+    doi: str | None
+
+
+class BrandRow(NamedTuple):
+    id: UUID
+    title: str | None
+    relevance: bool
+    goal: str | None
+    nature: str | None
+    year: int | None
+
+
+class ResearchReportRow(NamedTuple):
+    id: UUID
+    title: str | None
+    project_name: str | None
+    financing_institutionc: str | None
+    year: int | None
+
+
+class GuidanceRow(NamedTuple):
+    id: UUID
+    title: str | None
+    nature: str | None
+    oriented: str | None
+    type: str | None
+    status: str
+    year: int | None
+
+
+class ProjectRow(NamedTuple):
+    id: UUID
+    start_year: int | None
+    end_year: int | None
+    agency_code: str | None
+    agency_name: str | None
+    project_name: str | None
+    status: str | None
+    nature: str | None
+    number_undergraduates: int
+    number_specialists: int
+    number_academic_masters: int
+    number_phd: int
+    description: str | None
+    is_coordinator: bool
+
+
+class ProjectComponentRow(NamedTuple):
+    id: UUID
+    project_id: UUID
+    name: str | None
+    lattes_id: str | None
+    citations: str | None
+    coordinator: bool
+
+
+class ProjectFomentRow(NamedTuple):
+    project_id: UUID
+    agency_name: str | None
+    agency_code: str | None
+    nature: str | None
+
+
+ROW_TYPES = {
+    "researcher": ResearcherRow,
+    "education": EducationRow,
+    "bibliographic_production": ProductionRow,
+    "bibliographic_production_article": ArticleRow,
+    "bibliographic_production_book": BookRow,
+    "bibliographic_production_book_chapter": BookChapterRow,
+    "software": SoftwareRow,
+    "patent": PatentRow,
+    "registered_cultivar": CultivarRow,
+    "industrial_design": IndustrialDesignRow,
+    "brand": BrandRow,
+    "research_report": ResearchReportRow,
+    "guidance": GuidanceRow,
+    "research_project": ProjectRow,
+    "research_project_components": ProjectComponentRow,
+    "research_project_foment": ProjectFomentRow,
+}
+
+# Tables whose rows belong to the curriculum owner; the loader adds
+# researcher_id, which is only known after the researcher upsert.
+OWNED_TABLES = {
+    "education",
+    "bibliographic_production",
+    "software",
+    "patent",
+    "registered_cultivar",
+    "industrial_design",
+    "brand",
+    "research_report",
+    "guidance",
+    "research_project",
+}
+
+EDUCATION_DEGREES = {
+    "GRADUACAO": "GRADUATION",
+    "ESPECIALIZACAO": "SPECIALIZATION",
+    "MESTRADO": "MASTER",
+    "MESTRADO-PROFISSIONALIZANTE": "PROFESSIONAL_MASTER",
+    "DOUTORADO": "DOCTORATE",
+    "POS-DOUTORADO": "POSTDOC",
+    "LIVRE-DOCENCIA": "FREE_TEACHING",
+}
+
+COMPLETED_GUIDANCE = {
+    "ORIENTACOES-CONCLUIDAS-PARA-DOUTORADO",
+    "ORIENTACOES-CONCLUIDAS-PARA-MESTRADO",
+    "ORIENTACOES-CONCLUIDAS-PARA-POS-DOUTORADO",
+    "OUTRAS-ORIENTACOES-CONCLUIDAS",
+}
+ONGOING_GUIDANCE_PREFIX = "ORIENTACAO-EM-ANDAMENTO-"
+
+
+def clean(value):
+    if value is None:
+        return None
+    value = value.strip()
+    return value or None
+
+
+def to_int(value):
+    value = clean(value)
+    return int(value) if value and value.isdigit() else None
+
+
+def to_year(value):
+    value = clean(value)
+    return int(value) if value and len(value) == 4 and value.isdigit() else None
+
+
+def to_bool(value):
+    return clean(value) == "SIM"
+
+
+def to_date(value):
+    value = clean(value)
+    if not value or len(value) != 8 or not value.isdigit():
+        return None
+    try:
+        return datetime.strptime(value, "%d%m%Y")
+    except ValueError:
+        return None
+
+
+def child(elem, prefix):
+    for sub in elem:
+        if sub.tag.startswith(prefix):
+            return sub.attrib
+    return {}
+
+
+def authors(elem):
+    return "; ".join(
+        a.get("NOME-PARA-CITACAO") or a.get("NOME-COMPLETO-DO-AUTOR", "")
+        for a in elem.iter("AUTORES")
+    )
+
+
+def registration(elem):
+    for registro in elem.iter("REGISTRO-OU-PATENTE"):
+        return registro.attrib
+    return {}
+
+
+def production_row(basic, elem, kind, title_key, year_key, title_en_key):
+    return ProductionRow(
+        id=uuid.uuid4(),
+        title=clean(basic.get(title_key)) or "",
+        type=kind,
+        title_en=clean(basic.get(title_en_key)),
+        doi=clean(basic.get("DOI")),
+        nature=clean(basic.get("NATUREZA") or basic.get("TIPO")),
+        year=clean(basic.get(year_key)),
+        year_=to_year(basic.get(year_key)),
+        language=clean(basic.get("IDIOMA")),
+        means_divulgation=clean(basic.get("MEIO-DE-DIVULGACAO")),
+        homepage=clean(basic.get("HOME-PAGE-DO-TRABALHO")),
+        relevance=to_bool(basic.get("FLAG-RELEVANCIA")),
+        scientific_divulgation=to_bool(basic.get("FLAG-DIVULGACAO-CIENTIFICA")),
+        authors=authors(elem),
+    )
+
+
+def parse_article(elem, lattes_id):
+    basic = child(elem, "DADOS-BASICOS")
+    detail = child(elem, "DETALHAMENTO")
+    production = production_row(
+        basic,
+        elem,
+        "ARTICLE",
+        "TITULO-DO-ARTIGO",
+        "ANO-DO-ARTIGO",
+        "TITULO-DO-ARTIGO-INGLES",
+    )
+    yield "bibliographic_production", production
+    yield "bibliographic_production_article", ArticleRow(
+        id=uuid.uuid4(),
+        bibliographic_production_id=production.id,
+        volume=clean(detail.get("VOLUME")),
+        fascicle=clean(detail.get("FASCICULO")),
+        series=clean(detail.get("SERIE")),
+        start_page=clean(detail.get("PAGINA-INICIAL")),
+        end_page=clean(detail.get("PAGINA-FINAL")),
+        place_publication=clean(detail.get("LOCAL-DE-PUBLICACAO")),
+        periodical_magazine_name=clean(detail.get("TITULO-DO-PERIODICO-OU-REVISTA")),
+        issn=clean(detail.get("ISSN")),
+    )
+
+
+def parse_book(elem, lattes_id):
+    basic = child(elem, "DADOS-BASICOS")
+    detail = child(elem, "DETALHAMENTO")
+    production = production_row(
+        basic, elem, "BOOK", "TITULO-DO-LIVRO", "ANO", "TITULO-DO-LIVRO-INGLES"
+    )
+    yield "bibliographic_production", production
+    yield "bibliographic_production_book", BookRow(
+        id=uuid.uuid4(),
+        bibliographic_production_id=production.id,
+        isbn=clean(detail.get("ISBN")),
+        qtt_volume=clean(detail.get("NUMERO-DE-VOLUMES")),
+        qtt_pages=clean(detail.get("NUMERO-DE-PAGINAS")),
+        num_edition_revision=clean(detail.get("NUMERO-DA-EDICAO-REVISAO")),
+        num_series=clean(detail.get("NUMERO-DA-SERIE")),
+        publishing_company=clean(detail.get("NOME-DA-EDITORA")),
+        publishing_company_city=clean(detail.get("CIDADE-DA-EDITORA")),
+    )
+
+
+def parse_book_chapter(elem, lattes_id):
+    basic = child(elem, "DADOS-BASICOS")
+    detail = child(elem, "DETALHAMENTO")
+    production = production_row(
+        basic,
+        elem,
+        "BOOK_CHAPTER",
+        "TITULO-DO-CAPITULO-DO-LIVRO",
+        "ANO",
+        "TITULO-DO-CAPITULO-DO-LIVRO-INGLES",
+    )
+    yield "bibliographic_production", production
+    yield "bibliographic_production_book_chapter", BookChapterRow(
+        id=uuid.uuid4(),
+        bibliographic_production_id=production.id,
+        book_title=clean(detail.get("TITULO-DO-LIVRO")),
+        isbn=clean(detail.get("ISBN")),
+        start_page=clean(detail.get("PAGINA-INICIAL")),
+        end_page=clean(detail.get("PAGINA-FINAL")),
+        qtt_volume=clean(detail.get("NUMERO-DE-VOLUMES")),
+        organizers=clean(detail.get("ORGANIZADORES")),
+        num_edition_revision=clean(detail.get("NUMERO-DA-EDICAO-REVISAO")),
+        num_series=clean(detail.get("NUMERO-DA-SERIE")),
+        publishing_company=clean(detail.get("NOME-DA-EDITORA")),
+        publishing_company_city=clean(detail.get("CIDADE-DA-EDITORA")),
+    )
+
+
+def parse_software(elem, lattes_id):
+    basic = child(elem, "DADOS-BASICOS")
+    detail = child(elem, "DETALHAMENTO")
+    yield "software", SoftwareRow(
+        id=uuid.uuid4(),
+        title=clean(basic.get("TITULO-DO-SOFTWARE")),
+        platform=clean(detail.get("PLATAFORMA")),
+        goal=clean(detail.get("FINALIDADE")),
+        relevance=to_bool(basic.get("FLAG-RELEVANCIA")),
+        environment=clean(detail.get("AMBIENTE")),
+        availability=clean(detail.get("DISPONIBILIDADE")),
+        financing_institutionc=clean(detail.get("INSTITUICAO-FINANCIADORA")),
+        year=to_int(basic.get("ANO")),
+        code=clean(registration(elem).get("CODIGO-DO-REGISTRO-OU-PATENTE")),
+    )
+
+
+def parse_patent(elem, lattes_id):
+    basic = child(elem, "DADOS-BASICOS")
+    detail = child(elem, "DETALHAMENTO")
+    registro = registration(elem)
+    yield "patent", PatentRow(
+        id=uuid.uuid4(),
+        title=clean(basic.get("TITULO")),
+        category=clean(detail.get("CATEGORIA")),
+        relevance=to_bool(basic.get("FLAG-RELEVANCIA")),
+        development_year=clean(basic.get("ANO-DESENVOLVIMENTO")),
+        details=clean(detail.get("FINALIDADE")),
+        code=clean(registro.get("CODIGO-DO-REGISTRO-OU-PATENTE")),
+        grant_date=to_date(registro.get("DATA-DE-CONCESSAO")),
+        deposit_date=clean(registro.get("DATA-PEDIDO-DE-DEPOSITO")),
+    )
+
+
+def parse_cultivar(elem, lattes_id):
+    basic = child(elem, "DADOS-BASICOS")
+    yield "registered_cultivar", CultivarRow(
+        id=uuid.uuid4(),
+        denomination=clean(basic.get("DENOMINACAO")),
+        denomination_en=clean(basic.get("DENOMINACAO-INGLES")),
+        year=to_int(basic.get("ANO-SOLICITACAO")),
+        country=clean(basic.get("PAIS")),
+        code=clean(registration(elem).get("CODIGO-DO-REGISTRO-OU-PATENTE")),
+    )
+
+
+def parse_industrial_design(elem, lattes_id):
+    basic = child(elem, "DADOS-BASICOS")
+    yield "industrial_design", IndustrialDesignRow(
+        id=uuid.uuid4(),
+        title=clean(basic.get("TITULO")) or "",
+        production_sequence=to_int(elem.get("SEQUENCIA-PRODUCAO")),
+        title_en=clean(basic.get("TITULO-INGLES")),
+        year=clean(basic.get("ANO-DESENVOLVIMENTO")),
+        country=clean(basic.get("PAIS")),
+        language=clean(basic.get("IDIOMA")),
+        dissemination_medium=clean(basic.get("MEIO-DE-DIVULGACAO")),
+        homepage=clean(basic.get("HOME-PAGE-DO-TRABALHO")),
+        doi=clean(basic.get("DOI")),
+    )
+
+
+def parse_brand(elem, lattes_id):
+    basic = child(elem, "DADOS-BASICOS")
+    detail = child(elem, "DETALHAMENTO")
+    yield "brand", BrandRow(
+        id=uuid.uuid4(),
+        title=clean(basic.get("TITULO")),
+        relevance=to_bool(basic.get("FLAG-RELEVANCIA")),
+        goal=clean(detail.get("FINALIDADE")),
+        nature=clean(basic.get("NATUREZA")),
+        year=to_int(basic.get("ANO-DESENVOLVIMENTO")),
+    )
+
+
+def parse_research_report(elem, lattes_id):
+    basic = child(elem, "DADOS-BASICOS")
+    detail = child(elem, "DETALHAMENTO")
+    yield "research_report", ResearchReportRow(
+        id=uuid.uuid4(),
+        title=clean(basic.get("TITULO")),
+        project_name=clean(detail.get("NOME-DO-PROJETO")),
+        financing_institutionc=clean(detail.get("INSTITUICAO-FINANCIADORA")),
+        year=to_int(basic.get("ANO")),
+    )
+
+
+def parse_guidance(elem, status):
+    basic = child(elem, "DADOS-BASICOS")
+    detail = child(elem, "DETALHAMENTO")
+    nature = clean(basic.get("NATUREZA"))
+    yield "guidance", GuidanceRow(
+        id=uuid.uuid4(),
+        title=clean(basic.get("TITULO") or basic.get("TITULO-DO-TRABALHO")),
+        nature=nature.title() if nature else None,
+        oriented=clean(
+            detail.get("NOME-DO-ORIENTADO") or detail.get("NOME-DO-ORIENTANDO")
+        ),
+        type=clean(detail.get("TIPO-DE-ORIENTACAO")),
+        status=status,
+        year=to_int(basic.get("ANO")),
+    )
+
+
+def parse_completed_guidance(elem, lattes_id):
+    yield from parse_guidance(elem, "Concluída")
+
+
+def parse_ongoing_guidance(elem, lattes_id):
+    yield from parse_guidance(elem, "Em andamento")
+
+
+def parse_research_project(elem, lattes_id):
+    project_id = uuid.uuid4()
+    financier = next(elem.iter("FINANCIADOR-DO-PROJETO"), None)
+    first = financier.attrib if financier is not None else {}
+    components = []
+
+    for member in elem.iter("INTEGRANTES-DO-PROJETO"):
+        components.append(
+            ProjectComponentRow(
+                id=uuid.uuid4(),
+                project_id=project_id,
+                name=clean(member.get("NOME-COMPLETO")),
+                lattes_id=clean(member.get("NRO-ID-CNPQ")),
+                citations=clean(member.get("NOME-PARA-CITACAO")),
+                coordinator=to_bool(member.get("FLAG-RESPONSAVEL")),
+            )
+        )
+
+    yield "research_project", ProjectRow(
+        id=project_id,
+        start_year=to_int(elem.get("ANO-INICIO")),
+        end_year=to_int(elem.get("ANO-FIM")),
+        agency_code=clean(first.get("CODIGO-INSTITUICAO")),
+        agency_name=clean(first.get("NOME-INSTITUICAO")),
+        project_name=clean(elem.get("NOME-DO-PROJETO")),
+        status=clean(elem.get("SITUACAO")),
+        nature=clean(elem.get("NATUREZA")),
+        number_undergraduates=to_int(elem.get("NUMERO-GRADUACAO")) or 0,
+        number_specialists=to_int(elem.get("NUMERO-ESPECIALIZACAO")) or 0,
+        number_academic_masters=to_int(elem.get("NUMERO-MESTRADO-ACADEMICO")) or 0,
+        number_phd=to_int(elem.get("NUMERO-DOUTORADO")) or 0,
+        description=clean(elem.get("DESCRICAO-DO-PROJETO")),
+        is_coordinator=any(
+            c.coordinator and c.lattes_id == lattes_id for c in components
+        ),
+    )
+    for component in components:
+        yield "research_project_components", component
+
+    # research_project_foment is keyed by project_id, so only the first
+    # financier fits; the others are still listed in the XML.
+    if financier is not None:
+        yield "research_project_foment", ProjectFomentRow(
+            project_id=project_id,
+            agency_name=clean(first.get("NOME-INSTITUICAO")),
+            agency_code=clean(first.get("CODIGO-INSTITUICAO")),
+            nature=clean(first.get("NATUREZA")),
+        )
+
+
+def parse_education(elem, lattes_id):
+    yield "education", EducationRow(
+        id=uuid.uuid4(),
+        degree=EDUCATION_DEGREES[elem.tag],
+        education_name=clean(elem.get("NOME-CURSO")),
+        education_start=to_int(elem.get("ANO-DE-INICIO")),
+        education_end=to_int(elem.get("ANO-DE-CONCLUSAO")),
+        institution=clean(elem.get("NOME-INSTITUICAO")),
+        status=clean(elem.get("STATUS-DO-CURSO")),
+    )
+
+
+RECORD_PARSERS = {
+    "ARTIGO-PUBLICADO": parse_article,
+    "LIVRO-PUBLICADO-OU-ORGANIZADO": parse_book,
+    "CAPITULO-DE-LIVRO-PUBLICADO": parse_book_chapter,
+    "SOFTWARE": parse_software,
+    "PATENTE": parse_patent,
+    "CULTIVAR-REGISTRADA": parse_cultivar,
+    "DESENHO-INDUSTRIAL": parse_industrial_design,
+    "MARCA": parse_brand,
+    "RELATORIO-DE-PESQUISA": parse_research_report,
+    "PROJETO-DE-PESQUISA": parse_research_project,
+}
+
+
+def record_parser(tag, parent):
+    if tag in RECORD_PARSERS:
+        return RECORD_PARSERS[tag]
+    if tag in COMPLETED_GUIDANCE:
+        return parse_completed_guidance
+    if tag.startswith(ONGOING_GUIDANCE_PREFIX):
+        return parse_ongoing_guidance
+    if tag in EDUCATION_DEGREES and parent == "FORMACAO-ACADEMICA-TITULACAO":
+        return parse_education
+    return None
+
+
+def read_last_update(path: Path) -> datetime | None:
+    for _, elem in ET.iterparse(path, events=("start",)):
+        return to_date(elem.get("DATA-ATUALIZACAO"))
+    return None
+
+
+def parse_lattes(path: Path) -> Iterator[tuple[str, NamedTuple]]:
+    lattes_id = Path(path).stem
+    researcher = {"lattes_id": lattes_id, "last_update": None}
+    stack = []
+    in_record = 0
+
+    for event, elem in ET.iterparse(path, events=("start", "end")):
+        if event == "start":
+            parent = stack[-1][0].tag if stack else None
+            parser = None if in_record else record_parser(elem.tag, parent)
+            in_record += parser is not None
+            stack.append((elem, parser))
+
+            if elem.tag == "CURRICULO-VITAE":
+                researcher["last_update"] = to_date(elem.get("DATA-ATUALIZACAO"))
+            elif elem.tag == "DADOS-GERAIS":
+                researcher["name"] = clean(elem.get("NOME-COMPLETO")) or ""
+                researcher["citations"] = clean(
+                    elem.get("NOME-EM-CITACOES-BIBLIOGRAFICAS")
+                )
+                researcher["orcid"] = clean(elem.get("ORCID-ID"))
+            continue
+
+        _, parser = stack.pop()
+        if parser is not None:
+            yield from parser(elem, lattes_id)
+            in_record -= 1
+        elif elem.tag == "RESUMO-CV":
+            researcher["abstract"] = clean(elem.get("TEXTO-RESUMO-CV-RH"))
+            researcher["abstract_en"] = clean(elem.get("TEXTO-RESUMO-CV-RH-EN"))
+        elif elem.tag == "DADOS-GERAIS":
+            yield "researcher", ResearcherRow(
+                lattes_id=lattes_id,
+                name=researcher.get("name", ""),
+                citations=researcher.get("citations"),
+                orcid=researcher.get("orcid"),
+                abstract=researcher.get("abstract"),
+                abstract_en=researcher.get("abstract_en"),
+                last_update=researcher["last_update"],
+            )
+
+        # Outside a record nothing below this element is needed anymore;
+        # detaching it keeps the tree (and memory) flat however long the
+        # curriculum is.
+        if not in_record:
+            elem.clear()
+            if stack:
+                stack[-1][0].remove(elem)
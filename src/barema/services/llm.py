@@ -0,0 +1,172 @@
+import hashlib
+import json
+import random
+import threading
+import time
+import typing
+from functools import lru_cache
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from pydantic import BaseModel
+
+from barema.core.settings import get_settings
+
+CHARS_PER_TOKEN = 4
+
+
+class FakeLLMError(RuntimeError):
+    pass
+
+
+class FakeChatModel(BaseChatModel):
+    model_name: str = "fake"
+    json_mode: bool = False
+    schemas: tuple = ()
+    latency: float = 0.0
+    error_rate: float = 0.0
+    output_tokens: int = 200
+    seed: int = 0
+
+    _lock: threading.Lock
+    _rng: random.Random
+
+    def model_post_init(self, __context):
+        self._lock = threading.Lock()
+        self._rng = random.Random(self.seed)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def get_num_tokens(self, text: str) -> int:
+        return len(text) // CHARS_PER_TOKEN
+
+    def pick_schema(self, text: str):
+        ranked = [
+            (sum(f'"{name}"' in text for name in schema.model_fields), schema)
+            for schema in self.schemas
+        ]
+        ranked = [item for item in ranked if item[0] > 0]
+        if not ranked:
+            return None
+        return max(ranked, key=lambda item: item[0])[1]
+
+    def fake_value(self, annotation, rng: random.Random, index: int):
+        options = [a for a in typing.get_args(annotation) if a is not type(None)]
+        if options:
+            annotation = options[0]
+
+        if annotation is bool:
+            return rng.random() < 0.5
+        if annotation is int:
+            return rng.randint(0, 10)
+        if annotation is float:
+            return round(rng.uniform(0, 10), 2)
+        return f"Resposta simulada {index} ({rng.randint(1000, 9999)})"
+
+    def fake_content(self, text: str) -> str:
+        rng = random.Random(hashlib.sha256(text.encode()).hexdigest())
+
+        schema = self.pick_schema(text)
+        if schema is not None:
+            payload = {
+                name: self.fake_value(field.annotation, rng, index)
+                for index, (name, field) in enumerate(schema.model_fields.items())
+            }
+            return json.dumps(payload, ensure_ascii=False)
+
+        if self.json_mode:
+            return "{}"
+        return str(rng.random() < 0.5)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        text = "\n".join(str(message.content) for message in messages)
+
+        with self._lock:
+            failed = self._rng.random() < self.error_rate
+
+        if self.latency:
+            time.sleep(self.latency)
+        if failed:
+            raise FakeLLMError("Falha simulada do modelo")
+
+        input_tokens = self.get_num_tokens(text)
+        message = AIMessage(
+            content=self.fake_content(text),
+            usage_metadata={
+                "input_tokens": input_tokens,
+                "output_tokens": self.output_tokens,
+                "total_tokens": input_tokens + self.output_tokens,
+            },
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+@lru_cache
+def get_chat_model(
+    model: str, json_mode: bool = False, schemas: tuple[type[BaseModel], ...] = ()
+):
+    settings = get_settings()
+    if settings.LLM_BACKEND == "fake":
+        return FakeChatModel(
+            model_name=model,
+            json_mode=json_mode,
+            schemas=schemas,
+            latency=settings.FAKE_LLM_LATENCY,
+            error_rate=settings.FAKE_LLM_ERROR_RATE,
+            output_tokens=settings.FAKE_LLM_OUTPUT_TOKENS,
+            seed=settings.FAKE_LLM_SEED,
+        )
+
+    from langchain_openai import ChatOpenAI
+
+    model_kwargs = {}
+    if json_mode:
+        model_kwargs["response_format"] = {"type": "json_object"}
+
+    return ChatOpenAI(
+        api_key=settings.OPENAI_API_KEY,
+        model=model,
+        temperature=0,
+        model_kwargs=model_kwargs,
+    )
+
+
+if __name__ == "__main__":
+    from langchain_core.messages import HumanMessage
+
+    from barema.services.documents import dispatch_batches
+    from barema.services.structured_output import report_failures, validate_responses
+
+    class BenchmarkResult(BaseModel):
+        nota: int
+        observacao: str | None = None
+
+    settings = get_settings()
+    fake = FakeChatModel(
+        schemas=(BenchmarkResult,),
+        latency=settings.FAKE_LLM_LATENCY,
+        error_rate=settings.FAKE_LLM_ERROR_RATE,
+        output_tokens=settings.FAKE_LLM_OUTPUT_TOKENS,
+        seed=settings.FAKE_LLM_SEED,
+    )
+    prompts = [
+        (i, [HumanMessage(content=f'Documento {i}. Responda "nota" e "observacao".')])
+        for i in range(200)
+    ]
+
+    for batch_size, max_workers in ((1, 1), (16, 1), (16, 4), (32, 8)):
+        start = time.perf_counter()
+        respostas = dispatch_batches(fake, prompts, batch_size, max_workers)
+        validados = validate_responses(fake, respostas, BenchmarkResult, "benchmark")
+        elapsed = time.perf_counter() - start
+
+        ok = sum(value is not None for value in validados.values())
+        print(
+            f"batch={batch_size:>2} workers={max_workers}: {elapsed:6.2f} s, "
+            f"{len(prompts) / elapsed:7.1f} chamadas/s, {ok}/{len(prompts)} válidas"
+        )
+
+    report_failures("benchmark")
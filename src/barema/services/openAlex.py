@@ -1,28 +1,88 @@
+import gzip
+import json
+import re
+import threading
 import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from pathlib import Path
 
 import httpx
 import polars as pl
 from sqlalchemy import text
 
+from barema.core.settings import get_settings
 from barema.db.connection import get_session
 
-OPENALEX_URL = "https://api.openalex.org/authors/orcid:"
+OPENALEX_URL = "https://api.openalex.org/authors"
+BATCH_SIZE = 50
+REQUESTS_PER_SECOND = 10
+REQUEST_BUDGET = 200
+MAX_AGE_DAYS = 30
+SNAPSHOT_BATCH_SIZE = 1000
 
+ORCID_PATTERN = re.compile(
+    r'"orcid":\s*"(?:https?://orcid\.org/)?(\d{4}-\d{4}-\d{4}-\d{3}[\dX])"'
+)
 
-def get_researchers_without_openalex():
-    session = get_session()
 
+class TokenBucket:
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                elapsed = now - self.updated_at
+                self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+                self.updated_at = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                wait = (1 - self.tokens) / self.rate
+
+            time.sleep(wait)
+
+
+def normalize_orcid(orcid: str | None) -> str | None:
+    if not orcid:
+        return None
+    return orcid.strip().upper()[-19:]
+
+
+def get_researchers_to_refresh(
+    priority_lattes_ids=None, limit=None, max_age_days=MAX_AGE_DAYS
+):
     query = """
     SELECT r.id::text AS researcher_id, r.orcid
     FROM researcher r
     LEFT JOIN openalex_researcher opr
         ON r.id = opr.researcher_id
     WHERE r.orcid IS NOT NULL
-        AND opr.researcher_id IS NULL;
+        AND (opr.fetched_at IS NULL
+            OR opr.fetched_at < NOW() - MAKE_INTERVAL(days => :max_age_days))
+    ORDER BY
+        COALESCE(r.lattes_id = ANY(CAST(:priority_lattes_ids AS TEXT[])), false)
+            DESC,
+        opr.fetched_at ASC NULLS FIRST
+    LIMIT :limit;
     """
 
-    result = session.execute(text(query))
-    data = result.mappings().all()
+    params = {
+        "priority_lattes_ids": list(priority_lattes_ids or []),
+        "limit": limit,
+        "max_age_days": max_age_days,
+    }
+    with get_session() as session:
+        result = session.execute(text(query), params)
+        data = result.mappings().all()
 
     schema = {
         "researcher_id": pl.Utf8,
@@ -32,20 +92,66 @@ def get_researchers_without_openalex():
     return pl.DataFrame(data, schema=schema)
 
 
-def insert_openalex_researcher(row):
-    session = get_session()
+def get_researchers_by_orcid():
+    query = """
+    SELECT id::text AS researcher_id, orcid
+    FROM researcher
+    WHERE orcid IS NOT NULL;
+    """
+
+    with get_session() as session:
+        result = session.execute(text(query))
+        data = result.mappings().all()
+
+    by_orcid = {}
+    for row in data:
+        orcid = normalize_orcid(row["orcid"])
+        if orcid:
+            by_orcid.setdefault(orcid, []).append(row["researcher_id"])
+
+    return by_orcid
+
+
+def upsert_openalex_researchers(rows):
+    if not rows:
+        return
 
     query = """
     INSERT INTO public.openalex_researcher
         (researcher_id, h_index, relevance_score, works_count,
-        cited_by_count, i10_index, scopus, orcid, openalex)
+        cited_by_count, i10_index, scopus, orcid, openalex, fetched_at)
     VALUES
         (:researcher_id, :h_index, :relevance_score, :works_count,
-        :cited_by_count, :i10_index, :scopus, :orcid, :openalex);
+        :cited_by_count, :i10_index, :scopus, :orcid, :openalex, NOW())
+    ON CONFLICT (researcher_id) DO UPDATE SET
+        h_index = EXCLUDED.h_index,
+        relevance_score = EXCLUDED.relevance_score,
+        works_count = EXCLUDED.works_count,
+        cited_by_count = EXCLUDED.cited_by_count,
+        i10_index = EXCLUDED.i10_index,
+        scopus = EXCLUDED.scopus,
+        orcid = EXCLUDED.orcid,
+        openalex = EXCLUDED.openalex,
+        fetched_at = EXCLUDED.fetched_at;
+    """
+
+    with get_session() as session:
+        session.execute(text(query), rows)
+
+
+def mark_openalex_not_found(researcher_ids):
+    if not researcher_ids:
+        return
+
+    query = """
+    INSERT INTO public.openalex_researcher (researcher_id, fetched_at)
+    VALUES (:researcher_id, NOW())
+    ON CONFLICT (researcher_id) DO UPDATE SET
+        fetched_at = EXCLUDED.fetched_at;
     """
 
-    session.execute(text(query), row)
-    session.commit()
+    with get_session() as session:
+        session.execute(text(query), [{"researcher_id": i} for i in researcher_ids])
 
 
 def extract_researcher(researcher_id, data):
@@ -79,40 +185,130 @@ def extract_researcher(researcher_id, data):
         "openalex": openalex,
     }
 
-    insert_openalex_researcher(row)
+    return row
+
+
+def retry_delay(retry_after, attempt):
+    backoff = 2**attempt
+    if not retry_after:
+        return backoff
+    try:
+        return max(0.0, float(retry_after))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        return backoff
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def fetch_openalex_researchers(orcids, client, bucket):
+    params = {
+        "filter": "orcid:" + "|".join(orcids),
+        "per-page": BATCH_SIZE,
+    }
+    settings = get_settings()
+    if settings.OPENALEX_MAILTO:
+        params["mailto"] = settings.OPENALEX_MAILTO
+
+    for attempt in range(3):
+        bucket.acquire()
+        response = client.get(OPENALEX_URL, params=params)
+
+        if response.status_code == 200:
+            break
+        if response.status_code != 429 and response.status_code < 500:
+            response.raise_for_status()
+
+        time.sleep(retry_delay(response.headers.get("Retry-After"), attempt))
+    else:
+        response.raise_for_status()
 
+    authors = {}
+    for author in response.json().get("results", []):
+        orcid = normalize_orcid((author.get("ids") or {}).get("orcid"))
+        if orcid:
+            authors[orcid] = author
 
-def fetch_openalex_researcher(orcid):
-    url = OPENALEX_URL + orcid
+    return authors
+
+
+def scrapping_researcher_data(priority_lattes_ids=None, request_budget=REQUEST_BUDGET):
+    researchers = get_researchers_to_refresh(
+        priority_lattes_ids, limit=request_budget * BATCH_SIZE
+    )
+
+    by_orcid = {}
+    for row in researchers.iter_rows(named=True):
+        orcid = normalize_orcid(row["orcid"])
+        if orcid:
+            by_orcid.setdefault(orcid, []).append(row["researcher_id"])
+
+    orcids = list(by_orcid)
+    bucket = TokenBucket(rate=REQUESTS_PER_SECOND, capacity=REQUESTS_PER_SECOND)
 
     with httpx.Client(timeout=60) as client:
-        response = client.get(url)
+        for start in range(0, len(orcids), BATCH_SIZE):
+            batch = orcids[start : start + BATCH_SIZE]
+
+            try:
+                authors = fetch_openalex_researchers(batch, client, bucket)
+            except httpx.HTTPError as e:
+                print(f"[ERROR] FAILED BATCH {start // BATCH_SIZE}: {e}")
+                continue
+
+            rows = []
+            not_found = []
+            for orcid in batch:
+                data = authors.get(orcid)
+
+                for researcher_id in by_orcid[orcid]:
+                    if data:
+                        rows.append(extract_researcher(researcher_id, data))
+                    else:
+                        not_found.append(researcher_id)
+                        print(f"[404] NOT FOUND RESEARCHER {researcher_id}")
+
+            upsert_openalex_researchers(rows)
+            mark_openalex_not_found(not_found)
+            print(f"[201] UPSERTED {len(rows)} RESEARCHERS")
 
-    if response.status_code == 200:
-        return response.json()
 
-    return None
+def iter_snapshot_lines(path):
+    path = Path(path)
+    files = sorted(path.rglob("*.gz")) if path.is_dir() else [path]
 
+    for file in files:
+        with gzip.open(file, "rt", encoding="utf-8") as f:
+            yield from f
 
-def scrapping_researcher_data():
-    researchers = get_researchers_without_openalex()
 
-    rows = list(researchers.iter_rows(named=True))
+def ingest_openalex_snapshot(path):
+    by_orcid = get_researchers_by_orcid()
+    rows = []
+    total = 0
 
-    for row in rows:
-        researcher_id = row["researcher_id"]
-        orcid = row["orcid"]
+    for line in iter_snapshot_lines(path):
+        match = ORCID_PATTERN.search(line)
+        if not match or match.group(1) not in by_orcid:
+            continue
 
-        data = fetch_openalex_researcher(orcid)
+        data = json.loads(line)
 
-        if data:
-            extract_researcher(researcher_id, data)
+        for researcher_id in by_orcid[match.group(1)]:
+            rows.append(extract_researcher(researcher_id, data))
 
-            print(f"[201] CREATED RESEARCHER {researcher_id}")
-        else:
-            print(f"[404] NOT FOUND RESEARCHER {researcher_id}")
+        if len(rows) >= SNAPSHOT_BATCH_SIZE:
+            upsert_openalex_researchers(rows)
+            total += len(rows)
+            rows = []
 
-        time.sleep(6)
+    upsert_openalex_researchers(rows)
+    total += len(rows)
+    print(f"[201] UPSERTED {total} RESEARCHERS FROM SNAPSHOT")
 
 
 if __name__ == "__main__":
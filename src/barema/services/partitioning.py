@@ -0,0 +1,323 @@
+from datetime import datetime
+
+from sqlalchemy import text
+
+from barema.db.connection import get_session
+
+PARTITIONED_TABLES = {
+    "bibliographic_production": "year_",
+    "guidance": "year",
+}
+DEPENDENT_VIEWS = ["researcher_year_indicators"]
+
+DEFAULT_START_YEAR = 1990
+FUTURE_YEARS = 1
+
+# A BEFORE trigger on a partitioned table may not change the partition key,
+# so year_ is synced after the row is routed. The native loader writes year_
+# itself and its rows go straight to their partition; only writers that leave
+# year_ empty (the Hop pipeline) pay for the extra UPDATE that moves the row.
+SYNC_YEAR_FUNCTION = """
+CREATE OR REPLACE FUNCTION bibliographic_production_sync_year_partitioned()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE bibliographic_production
+    SET year_ = CASE WHEN NEW.year ~ '^[0-9]{4}$' THEN NEW.year::integer END
+    WHERE id = NEW.id
+        AND year_ IS DISTINCT FROM
+            CASE WHEN NEW.year ~ '^[0-9]{4}$' THEN NEW.year::integer END;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+PARTITION_TRIGGERS = {
+    "bibliographic_production": [
+        # The legacy BEFORE trigger went away with the legacy table.
+        "DROP FUNCTION IF EXISTS bibliographic_production_sync_year()",
+        SYNC_YEAR_FUNCTION,
+        """
+        CREATE TRIGGER bibliographic_production_sync_year
+        AFTER INSERT OR UPDATE OF year, year_ ON bibliographic_production
+        FOR EACH ROW EXECUTE FUNCTION
+            bibliographic_production_sync_year_partitioned()
+        """,
+    ],
+}
+
+
+def is_partitioned(session, table: str) -> bool:
+    query = """
+    SELECT EXISTS (
+        SELECT 1 FROM pg_partitioned_table pt
+        JOIN pg_class c ON c.oid = pt.partrelid
+        WHERE c.relname = :table
+    )
+    """
+    return session.execute(text(query), {"table": table}).scalar_one()
+
+
+def save_views(session):
+    views = {}
+    for view in DEPENDENT_VIEWS:
+        definition = session.execute(
+            text("SELECT pg_get_viewdef(CAST(:view AS regclass), true)"),
+            {"view": view},
+        ).scalar_one()
+        indexes = session.execute(
+            text("SELECT indexdef FROM pg_indexes WHERE tablename = :view"),
+            {"view": view},
+        ).scalars()
+        views[view] = (definition, list(indexes))
+        session.execute(text(f"DROP MATERIALIZED VIEW {view}"))
+    return views
+
+
+def restore_views(session, views):
+    for view, (definition, indexes) in views.items():
+        print(f"Recriando {view}...")
+        session.execute(text(f"CREATE MATERIALIZED VIEW {view} AS {definition}"))
+        for indexdef in indexes:
+            session.execute(text(indexdef))
+
+
+def drop_referencing_foreign_keys(session, table: str):
+    query = """
+    SELECT conrelid::regclass::text AS source, conname
+    FROM pg_constraint
+    WHERE contype = 'f' AND confrelid = CAST(:table AS regclass)
+    """
+    dropped = []
+    for row in session.execute(text(query), {"table": table}).mappings().all():
+        print(f"Removendo {row['conname']} de {row['source']}")
+        session.execute(
+            text(f'ALTER TABLE {row["source"]} DROP CONSTRAINT "{row["conname"]}"')
+        )
+        dropped.append(f"{row['source']}.{row['conname']}")
+    return dropped
+
+
+def copy_constraints_and_indexes(session, legacy: str, table: str):
+    foreign_keys = (
+        session.execute(
+            text("""
+            SELECT conname, pg_get_constraintdef(oid) AS definition
+            FROM pg_constraint
+            WHERE contype = 'f' AND conrelid = CAST(:legacy AS regclass)
+            """),
+            {"legacy": legacy},
+        )
+        .mappings()
+        .all()
+    )
+    for row in foreign_keys:
+        session.execute(
+            text(
+                f'ALTER TABLE {table} ADD CONSTRAINT "{row["conname"]}" '
+                f"{row['definition']}"
+            )
+        )
+
+    indexes = (
+        session.execute(
+            text("""
+            SELECT i.indexname, i.indexdef
+            FROM pg_indexes i
+            WHERE i.tablename = :legacy
+                AND NOT EXISTS (
+                    SELECT 1 FROM pg_constraint c
+                    WHERE c.conindid = CAST(i.indexname AS regclass)
+                )
+            """),
+            {"legacy": legacy},
+        )
+        .mappings()
+        .all()
+    )
+    for row in indexes:
+        session.execute(text(f'DROP INDEX "{row["indexname"]}"'))
+        indexdef = row["indexdef"].replace(f" ON public.{legacy} ", f" ON {table} ")
+        session.execute(text(indexdef))
+
+
+def create_partition(
+    session, table: str, lower, upper, name: str, tablespace: str | None = None
+):
+    storage = f" TABLESPACE {tablespace}" if tablespace else ""
+    session.execute(
+        text(
+            f"CREATE TABLE {name} PARTITION OF {table} "
+            f"FOR VALUES FROM ({lower}) TO ({upper}){storage}"
+        )
+    )
+
+
+def partition_table(
+    session,
+    table: str,
+    column: str,
+    start_year: int,
+    end_year: int,
+    archive_before: int | None = None,
+    tablespace: str | None = None,
+):
+    legacy = f"{table}_legacy"
+    print(f"Particionando {table} por {column} ({start_year}-{end_year})...")
+
+    session.execute(text(f"ALTER TABLE {table} RENAME TO {legacy}"))
+    dropped = drop_referencing_foreign_keys(session, legacy)
+
+    session.execute(
+        text(
+            f"CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS "
+            f"INCLUDING GENERATED INCLUDING STORAGE) PARTITION BY RANGE ({column})"
+        )
+    )
+    session.execute(
+        text(
+            f"ALTER TABLE {table} ADD CONSTRAINT {table}_id_{column}_key "
+            f"UNIQUE (id, {column})"
+        )
+    )
+
+    archived = tablespace if archive_before else None
+    create_partition(
+        session, table, "MINVALUE", start_year, f"{table}_before_{start_year}", archived
+    )
+    for year in range(start_year, end_year + 1):
+        old = archive_before is not None and year < archive_before
+        create_partition(
+            session,
+            table,
+            year,
+            year + 1,
+            f"{table}_{year}",
+            tablespace if old else None,
+        )
+    session.execute(text(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT"))
+
+    session.execute(text(f"INSERT INTO {table} SELECT * FROM {legacy}"))
+    copy_constraints_and_indexes(session, legacy, table)
+    session.execute(text(f"DROP TABLE {legacy}"))
+    for statement in PARTITION_TRIGGERS.get(table, []):
+        session.execute(text(statement))
+    return dropped
+
+
+def partition_production_tables(
+    start_year: int = DEFAULT_START_YEAR,
+    end_year: int | None = None,
+    archive_before: int | None = None,
+    tablespace: str | None = None,
+):
+    end_year = end_year or datetime.now().year + FUTURE_YEARS
+
+    with get_session() as session:
+        pending = {
+            table: column
+            for table, column in PARTITIONED_TABLES.items()
+            if not is_partitioned(session, table)
+        }
+        if not pending:
+            print("Tabelas já particionadas.")
+            return
+
+        views = save_views(session)
+        dropped = []
+        for table, column in pending.items():
+            dropped += partition_table(
+                session,
+                table,
+                column,
+                start_year,
+                end_year,
+                archive_before,
+                tablespace,
+            )
+        restore_views(session, views)
+
+    if dropped:
+        print(
+            "[Aviso] Chaves estrangeiras para as tabelas particionadas foram "
+            "removidas; o PostgreSQL só aceita referências que incluam a coluna "
+            f"de partição: {', '.join(dropped)}"
+        )
+
+    with get_session() as session:
+        for table in pending:
+            session.execute(text(f"ANALYZE {table}"))
+
+
+def extend_partitions(until_year: int | None = None):
+    until_year = until_year or datetime.now().year + FUTURE_YEARS
+
+    with get_session() as session:
+        for table, column in PARTITIONED_TABLES.items():
+            if not is_partitioned(session, table):
+                continue
+
+            existing = set(
+                session.execute(
+                    text("""
+                        SELECT c.relname
+                        FROM pg_inherits i
+                        JOIN pg_class c ON c.oid = i.inhrelid
+                        WHERE i.inhparent = CAST(:table AS regclass)
+                        """),
+                    {"table": table},
+                ).scalars()
+            )
+            years = [
+                int(name.removeprefix(f"{table}_"))
+                for name in existing
+                if name.removeprefix(f"{table}_").isdigit()
+            ]
+            missing = list(range(max(years, default=until_year) + 1, until_year + 1))
+            if not missing:
+                continue
+
+            default = f"{table}_default"
+            session.execute(text(f"ALTER TABLE {table} DETACH PARTITION {default}"))
+            for year in missing:
+                print(f"Criando partição {table}_{year}...")
+                create_partition(session, table, year, year + 1, f"{table}_{year}")
+                session.execute(
+                    text(
+                        f"WITH moved AS (DELETE FROM {default} "
+                        f"WHERE {column} >= :lower AND {column} < :upper "
+                        f"RETURNING *) INSERT INTO {table} SELECT * FROM moved"
+                    ),
+                    {"lower": year, "upper": year + 1},
+                )
+            session.execute(
+                text(f"ALTER TABLE {table} ATTACH PARTITION {default} DEFAULT")
+            )
+
+
+def archive_partitions(before_year: int, tablespace: str):
+    with get_session() as session:
+        for table in PARTITIONED_TABLES:
+            if not is_partitioned(session, table):
+                continue
+
+            partitions = session.execute(
+                text("""
+                    SELECT c.relname
+                    FROM pg_inherits i
+                    JOIN pg_class c ON c.oid = i.inhrelid
+                    WHERE i.inhparent = CAST(:table AS regclass)
+                    """),
+                {"table": table},
+            ).scalars()
+            for partition in partitions:
+                suffix = partition.removeprefix(f"{table}_")
+                # <table>_before_N only holds years below N.
+                if suffix.startswith("before_"):
+                    suffix = suffix.removeprefix("before_")
+                    old = suffix.isdigit() and int(suffix) <= before_year
+                else:
+                    old = suffix.isdigit() and int(suffix) < before_year
+                if old:
+                    print(f"Movendo {partition} para {tablespace}...")
+                    session.execute(
+                        text(f"ALTER TABLE {partition} SET TABLESPACE {tablespace}")
+                    )
@@ -0,0 +1,47 @@
+from sqlalchemy import text
+
+from barema.db.connection import get_session
+
+INDICATOR_VIEWS = ["researcher_year_indicators"]
+
+RESOLVE_COORDINATORS = """
+WITH coordinators AS (
+    SELECT DISTINCT rpc.project_id, r.id AS researcher_id
+    FROM research_project_components rpc
+    JOIN researcher r ON r.lattes_id = rpc.lattes_id
+    WHERE rpc.coordinator IS TRUE
+)
+UPDATE research_project rp
+SET is_coordinator = (c.project_id IS NOT NULL)
+FROM research_project p
+LEFT JOIN coordinators c
+    ON c.project_id = p.id AND c.researcher_id = p.researcher_id
+WHERE rp.id = p.id
+    AND rp.is_coordinator IS DISTINCT FROM (c.project_id IS NOT NULL)
+"""
+
+SYNC_PRODUCTION_YEARS = """
+UPDATE bibliographic_production
+SET year_ = CASE WHEN year ~ '^[0-9]{4}$' THEN year::integer END
+WHERE year_ IS DISTINCT FROM CASE WHEN year ~ '^[0-9]{4}$' THEN year::integer END
+"""
+
+
+def sync_production_years():
+    with get_session() as session:
+        result = session.execute(text(SYNC_PRODUCTION_YEARS))
+    print(f"{result.rowcount} produção(ões) com ano atualizado")
+
+
+def resolve_project_coordinators():
+    print("Resolvendo coordenadores de projetos...")
+    with get_session() as session:
+        result = session.execute(text(RESOLVE_COORDINATORS))
+    print(f"{result.rowcount} projeto(s) atualizado(s)")
+
+
+def refresh_indicators():
+    with get_session() as session:
+        for view in INDICATOR_VIEWS:
+            print(f"Atualizando {view}...")
+            session.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view}"))
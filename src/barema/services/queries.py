@@ -5,7 +5,6 @@ from barema.db.connection import get_session
 
 
 def get_researchers():
-    session = get_session()
     query = """
     SELECT id::text AS researcher_id, name AS nome, lattes_id,
         openalex_researcher.h_index, last_update::varchar AS last_update
@@ -13,8 +12,9 @@ def get_researchers():
     LEFT JOIN openalex_researcher ON
         openalex_researcher.researcher_id = researcher.id
     """
-    result = session.execute(text(query))
-    data = result.mappings().all()
+    with get_session() as session:
+        result = session.execute(text(query))
+        data = result.mappings().all()
     schema = {
         "researcher_id": pl.Utf8,
         "nome": pl.Utf8,
@@ -26,7 +26,6 @@ def get_researchers():
 
 
 def get_phd_time():
-    session = get_session()
     query = """
     SELECT DISTINCT ON (researcher_id)
         researcher_id::text,
@@ -36,225 +35,134 @@ def get_phd_time():
         AND education_end IS NOT NULL
     ORDER BY researcher_id, education_end ASC;
     """
-    result = session.execute(text(query))
-    data = result.mappings().all()
+    with get_session() as session:
+        result = session.execute(text(query))
+        data = result.mappings().all()
     schema = {"researcher_id": pl.Utf8, "tempo_doutorado": pl.Int32}
     return pl.DataFrame(data, schema=schema)
 
 
 def get_foment_level():
-    session = get_session()
     query = """
     SELECT researcher_id::text, foment.category_level_code AS nivel_bolsa
     FROM foment;
     """
-    result = session.execute(text(query))
-    data = result.mappings().all()
+    with get_session() as session:
+        result = session.execute(text(query))
+        data = result.mappings().all()
     schema = {"researcher_id": pl.Utf8, "nivel_bolsa": pl.Utf8}
     return pl.DataFrame(data, schema=schema)
 
 
-def get_articles():
-    session = get_session()
-    query = """
-    SELECT researcher_id::text, year::int, COUNT(*) as qtd
-    FROM bibliographic_production
-    WHERE type = 'ARTICLE' AND year IS NOT NULL
-    GROUP BY researcher_id, year;
+INDICATORS = {
+    "articles",
+    "books",
+    "software",
+    "no_reg_software",
+    "cultivar_patents",
+    "other_technical_production",
+    "guidance_postdoc",
+    "phd_completed",
+    "phd_ongoing",
+    "msc_completed",
+    "msc_ongoing",
+}
+
+
+def get_indicator(indicator: str, min_year: int | None = None):
+    if indicator not in INDICATORS:
+        raise ValueError(f"Indicador desconhecido: {indicator}")
+
+    query = f"""
+    SELECT researcher_id::text, year, {indicator} AS qtd
+    FROM researcher_year_indicators
+    WHERE {indicator} > 0
+        AND (CAST(:min_year AS INT) IS NULL OR year >= :min_year)
     """
-    result = session.execute(text(query))
-    data = result.mappings().all()
+    with get_session() as session:
+        result = session.execute(text(query), {"min_year": min_year})
+        data = result.mappings().all()
     schema = {"researcher_id": pl.Utf8, "year": pl.Int32, "qtd": pl.Int64}
     return pl.DataFrame(data, schema=schema)
 
 
-def get_cultivar_patents():
-    session = get_session()
-    query = """
-    SELECT researcher_id, year, SUM(qtd) as qtd
-    FROM (
-        SELECT researcher_id::text, year::int AS year, COUNT(*) as qtd
-        FROM registered_cultivar
-        GROUP BY researcher_id, year
-
-        UNION ALL
-
-        SELECT researcher_id::text, development_year::int AS year, COUNT(*) as qtd
-        FROM patent
-        GROUP BY researcher_id, development_year
-    ) t
-    GROUP BY researcher_id, year;
-    """
-    result = session.execute(text(query))
-    data = result.mappings().all()
-    schema = {"researcher_id": pl.Utf8, "year": pl.Int32, "qtd": pl.Int64}
-    return pl.DataFrame(data, schema=schema)
+def get_articles(min_year: int | None = None):
+    return get_indicator("articles", min_year)
 
 
-def get_books():
-    session = get_session()
-    query = """
-    SELECT researcher_id::text, year::int, COUNT(*) as qtd
-    FROM bibliographic_production
-    WHERE type IN ('BOOK', 'BOOK_CHAPTER') AND year IS NOT NULL
-    GROUP BY researcher_id, year;
-    """
-    result = session.execute(text(query))
-    data = result.mappings().all()
-    schema = {"researcher_id": pl.Utf8, "year": pl.Int32, "qtd": pl.Int64}
-    return pl.DataFrame(data, schema=schema)
+def get_cultivar_patents(min_year: int | None = None):
+    return get_indicator("cultivar_patents", min_year)
 
 
-def get_software():
-    session = get_session()
-    query = """
-    SELECT researcher_id::text, year::int, COUNT(*) as qtd
-    FROM software
-    WHERE code IS NOT NULL
-    GROUP BY researcher_id, year;
-    """
-    result = session.execute(text(query))
-    data = result.mappings().all()
-    schema = {"researcher_id": pl.Utf8, "year": pl.Int32, "qtd": pl.Int64}
-    return pl.DataFrame(data, schema=schema)
+def get_books(min_year: int | None = None):
+    return get_indicator("books", min_year)
 
 
-def get_no_reg_software():
-    session = get_session()
-    query = """
-    SELECT researcher_id::text, year::int, COUNT(*) as qtd
-    FROM software
-    WHERE code IS NULL
-    GROUP BY researcher_id, year;
-    """
-    result = session.execute(text(query))
-    data = result.mappings().all()
-    schema = {"researcher_id": pl.Utf8, "year": pl.Int32, "qtd": pl.Int64}
-    return pl.DataFrame(data, schema=schema)
+def get_software(min_year: int | None = None):
+    return get_indicator("software", min_year)
 
 
-def get_other_technical_production():
-    session = get_session()
-    query = """
-    WITH combined_data AS (
-        SELECT researcher_id::text, year::int
-        FROM industrial_design
-        UNION ALL
-        SELECT researcher_id::text, year::int
-        FROM brand
-        UNION ALL
-        SELECT researcher_id::text, year::int
-        FROM research_report
-    )
-    SELECT researcher_id, year, COUNT(*) as qtd
-    FROM combined_data
-    GROUP BY researcher_id, year;
-    """
-    result = session.execute(text(query))
-    data = result.mappings().all()
-    schema = {"researcher_id": pl.Utf8, "year": pl.Int32, "qtd": pl.Int64}
-    return pl.DataFrame(data, schema=schema)
+def get_no_reg_software(min_year: int | None = None):
+    return get_indicator("no_reg_software", min_year)
 
 
-def get_guidance_postdoc():
-    session = get_session()
-    query = """
-    SELECT researcher_id::text, year, COUNT(*) as qtd
-    FROM guidance
-    WHERE nature = 'Supervisão De Pós-Doutorado'
-    GROUP BY researcher_id, year;
-    """
-    result = session.execute(text(query))
-    data = result.mappings().all()
-    schema = {"researcher_id": pl.Utf8, "year": pl.Int32, "qtd": pl.Int64}
-    return pl.DataFrame(data, schema=schema)
+def get_other_technical_production(min_year: int | None = None):
+    return get_indicator("other_technical_production", min_year)
 
 
-def get_phd_completed():
-    session = get_session()
-    query = """
-    SELECT researcher_id::text, year, COUNT(*) as qtd
-    FROM guidance
-    WHERE nature = 'Tese De Doutorado'
-        AND guidance.status = 'Concluída'
-    GROUP BY researcher_id, year;
-    """
-    result = session.execute(text(query))
-    data = result.mappings().all()
-    schema = {"researcher_id": pl.Utf8, "year": pl.Int32, "qtd": pl.Int64}
-    return pl.DataFrame(data, schema=schema)
+def get_guidance_postdoc(min_year: int | None = None):
+    return get_indicator("guidance_postdoc", min_year)
 
 
-def get_phd_ongoing():
-    session = get_session()
-    query = """
-    SELECT researcher_id::text, year, COUNT(*) as qtd
-    FROM guidance
-    WHERE nature = 'Tese De Doutorado'
-        AND guidance.status = 'Em andamento'
-    GROUP BY researcher_id, year;
-    """
-    result = session.execute(text(query))
-    data = result.mappings().all()
-    schema = {"researcher_id": pl.Utf8, "year": pl.Int32, "qtd": pl.Int64}
-    return pl.DataFrame(data, schema=schema)
+def get_phd_completed(min_year: int | None = None):
+    return get_indicator("phd_completed", min_year)
 
 
-def get_msc_completed():
-    session = get_session()
-    query = """
-    SELECT researcher_id::text, year, COUNT(*) as qtd
-    FROM guidance
-    WHERE nature = 'Dissertação De Mestrado'
-        AND guidance.status =  'Concluída'
-    GROUP BY researcher_id, year;
-    """
-    result = session.execute(text(query))
-    data = result.mappings().all()
-    schema = {"researcher_id": pl.Utf8, "year": pl.Int32, "qtd": pl.Int64}
-    return pl.DataFrame(data, schema=schema)
+def get_phd_ongoing(min_year: int | None = None):
+    return get_indicator("phd_ongoing", min_year)
+
+
+def get_msc_completed(min_year: int | None = None):
+    return get_indicator("msc_completed", min_year)
 
 
 def get_project_funding_agencies():
-    session = get_session()
     query = """
     SELECT DISTINCT agency_name::VARCHAR, NULL AS company_or_organization
     FROM research_project_foment
     """
-    result = session.execute(text(query))
-    data = result.mappings().all()
+    with get_session() as session:
+        result = session.execute(text(query))
+        data = result.mappings().all()
     schema = {"agency_name": pl.Utf8, "company_or_organization": pl.Boolean}
     return pl.DataFrame(data, schema=schema)
 
 
-def get_research_projects():
-    session = get_session()
+def get_research_projects(min_year: int | None = None):
     query = """
     SELECT 
         rp.id::text AS project_id, 
         rp.researcher_id::text, 
         COALESCE(rp.end_year, EXTRACT(YEAR FROM CURRENT_DATE)::INT) AS year, 
         ARRAY_AGG(rpf.agency_name) AS agency_names,
-        EXISTS (
-            SELECT 1 
-            FROM research_project_components rpc 
-            JOIN researcher r ON r.lattes_id = rpc.lattes_id
-            WHERE rpc.project_id = rp.id 
-            AND r.id = rp.researcher_id 
-            AND rpc.coordinator IS TRUE
-        ) AS is_coordinator,
+        rp.is_coordinator,
         rp.nature
     FROM research_project rp
     LEFT JOIN research_project_foment rpf 
         ON rpf.project_id = rp.id
+    WHERE CAST(:min_year AS INT) IS NULL
+        OR rp.end_year IS NULL
+        OR rp.end_year >= :min_year
     GROUP BY 
         rp.id, 
         rp.researcher_id, 
         year,
+        rp.is_coordinator,
         rp.nature;
     """
-    result = session.execute(text(query))
-    data = result.mappings().all()
+    with get_session() as session:
+        result = session.execute(text(query), {"min_year": min_year})
+        data = result.mappings().all()
     schema = {
         "project_id": pl.String,
         "researcher_id": pl.String,
@@ -266,42 +174,31 @@ def get_research_projects():
     return pl.DataFrame(data, schema=schema)
 
 
-def get_msc_ongoing():
-    session = get_session()
-    query = """
-    SELECT researcher_id::text, year, COUNT(*) as qtd
-    FROM guidance
-    WHERE nature = 'Dissertação De Mestrado'
-        AND guidance.status = 'Em andamento'
-    GROUP BY researcher_id, year;
-    """
-    result = session.execute(text(query))
-    data = result.mappings().all()
-    schema = {"researcher_id": pl.Utf8, "year": pl.Int32, "qtd": pl.Int64}
-    return pl.DataFrame(data, schema=schema)
+def get_msc_ongoing(min_year: int | None = None):
+    return get_indicator("msc_ongoing", min_year)
 
 
 def get_coord_research_projects():
-    session = get_session()
     query = """
     """
-    result = session.execute(text(query))
-    data = result.mappings().all()
+    with get_session() as session:
+        result = session.execute(text(query))
+        data = result.mappings().all()
     schema = {"researcher_id": pl.Utf8, "year": pl.Int32, "qtd": pl.Int64}
     return pl.DataFrame(data, schema=schema)
 
 
 def fat_articles():
-    session = get_session()
     query = """
-    SELECT title, year::INT, qualis, periodical_magazine_id::TEXT,
+    SELECT title, year_ AS year, qualis, periodical_magazine_id::TEXT,
         researcher_id::TEXT, nature
     FROM bibliographic_production
     INNER JOIN bibliographic_production_article 
         ON bibliographic_production_article.bibliographic_production_id = bibliographic_production.id
     """
-    result = session.execute(text(query))
-    data = result.mappings().all()
+    with get_session() as session:
+        result = session.execute(text(query))
+        data = result.mappings().all()
 
     schema = {
         "title": pl.Utf8,
@@ -316,22 +213,22 @@ def fat_articles():
 
 
 def fat_books():
-    session = get_session()
     query = """
-    SELECT title, year::INT, nature, isbn, researcher_id::TEXT
+    SELECT title, year_ AS year, nature, isbn, researcher_id::TEXT
     FROM bibliographic_production
         INNER JOIN bibliographic_production_book 
             ON bibliographic_production_book.bibliographic_production_id = bibliographic_production.id
 
     UNION ALL
 
-    SELECT title, year::INT, nature, isbn, researcher_id::TEXT
+    SELECT title, year_ AS year, nature, isbn, researcher_id::TEXT
     FROM bibliographic_production
         INNER JOIN bibliographic_production_book_chapter
             ON bibliographic_production_book_chapter.bibliographic_production_id = bibliographic_production.id
     """
-    result = session.execute(text(query))
-    data = result.mappings().all()
+    with get_session() as session:
+        result = session.execute(text(query))
+        data = result.mappings().all()
 
     schema = {
         "title": pl.Utf8,
@@ -345,14 +242,14 @@ def fat_books():
 
 
 def fat_software():
-    session = get_session()
     query = """
-    SELECT title, goal, financing_institutionc, researcher_id::TEXT, year::INT,
+    SELECT title, goal, financing_institutionc, researcher_id::TEXT, year,
         code
     FROM public.software;
     """
-    result = session.execute(text(query))
-    data = result.mappings().all()
+    with get_session() as session:
+        result = session.execute(text(query))
+        data = result.mappings().all()
 
     schema = {
         "title": pl.Utf8,
@@ -367,14 +264,14 @@ def fat_software():
 
 
 def fat_patent():
-    session = get_session()
     query = """
-    SELECT title, category, development_year::INT, details, researcher_id::TEXT, code,
+    SELECT title, category, development_year_ AS development_year, details, researcher_id::TEXT, code,
         grant_date::DATE, deposit_date::DATE
     FROM public.patent;
     """
-    result = session.execute(text(query))
-    data = result.mappings().all()
+    with get_session() as session:
+        result = session.execute(text(query))
+        data = result.mappings().all()
 
     schema = {
         "title": pl.Utf8,
@@ -391,14 +288,14 @@ def fat_patent():
 
 
 def fat_cultivar():
-    session = get_session()
     query = """
-    SELECT denomination, year::INT, country, code,
+    SELECT denomination, year, country, code,
         researcher_id::TEXT
     FROM public.registered_cultivar;
     """
-    result = session.execute(text(query))
-    data = result.mappings().all()
+    with get_session() as session:
+        result = session.execute(text(query))
+        data = result.mappings().all()
 
     schema = {
         "denomination": pl.Utf8,
@@ -22,7 +22,8 @@ def merge_data(main_df, extra_df):
 def process_and_merge_production(
     df_researchers, get_data_func, total_col_name, base_year=2026
 ):
-    df_data = get_data_func()
+    min_year = base_year - (df_researchers["window_years"].max() or 0)
+    df_data = get_data_func(min_year=min_year)
     df_filtered = filter_by_window(df_data, df_researchers, base_year=base_year)
 
     df_grouped = df_filtered.group_by("researcher_id").agg(
@@ -0,0 +1,99 @@
+import json
+import re
+from collections import Counter
+
+from langchain_core.messages import HumanMessage
+from pydantic import BaseModel, ValidationError
+
+from barema.prompts import PROMPT_REPARO
+
+MAX_REPAIR_ROUNDS = 2
+MAX_REPAIR_CHARS = 8000
+
+FENCE_PATTERN = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$")
+
+FAILURES = Counter()
+
+
+def response_content(resposta) -> str | None:
+    if isinstance(resposta, BaseException):
+        return None
+    return getattr(resposta, "content", resposta)
+
+
+def parse_response(resposta, schema: type[BaseModel]):
+    if isinstance(resposta, BaseException):
+        return None, f"{type(resposta).__name__}: {resposta}"
+
+    content = FENCE_PATTERN.sub("", response_content(resposta) or "")
+    try:
+        return schema.model_validate_json(content), None
+    except ValidationError as e:
+        return None, str(e)
+
+
+def repair_prompt(content: str, error: str, schema: type[BaseModel]) -> str:
+    return PROMPT_REPARO.format(
+        esquema=json.dumps(schema.model_json_schema(), ensure_ascii=False),
+        erros=error,
+        resposta=content[:MAX_REPAIR_CHARS],
+    )
+
+
+def validate_responses(llm, respostas: dict, schema: type[BaseModel], label: str):
+    parsed = {}
+    invalid = {}
+
+    for key, resposta in respostas.items():
+        result, error = parse_response(resposta, schema)
+        if result is not None:
+            parsed[key] = result
+            continue
+
+        content = response_content(resposta)
+        if content is None:
+            FAILURES[(label, "erro_chamada")] += 1
+            parsed[key] = None
+        else:
+            FAILURES[(label, "invalida")] += 1
+            invalid[key] = (content, error)
+
+    for _ in range(MAX_REPAIR_ROUNDS):
+        if not invalid:
+            break
+
+        keys = list(invalid)
+        prompts = [
+            [HumanMessage(content=repair_prompt(content, error, schema))]
+            for content, error in invalid.values()
+        ]
+        reparos = llm.batch(prompts, return_exceptions=True)
+
+        still_invalid = {}
+        for key, resposta in zip(keys, reparos):
+            result, error = parse_response(resposta, schema)
+            if result is not None:
+                FAILURES[(label, "reparada")] += 1
+                parsed[key] = result
+            else:
+                content = response_content(resposta) or invalid[key][0]
+                still_invalid[key] = (content, error)
+
+        invalid = still_invalid
+
+    for key in invalid:
+        FAILURES[(label, "descartada")] += 1
+        parsed[key] = None
+
+    return parsed
+
+
+def report_failures(label: str):
+    counts = {
+        status: FAILURES.pop((name, status))
+        for name, status in list(FAILURES)
+        if name == label
+    }
+    if counts:
+        resumo = ", ".join(f"{status}: {count}" for status, count in counts.items())
+        print(f"[{label}] Respostas fora do esquema -> {resumo}")
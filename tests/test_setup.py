@@ -0,0 +1,20 @@
+import subprocess
+
+from barema.core import setup
+
+
+def test_db_up_runs_compose_and_migrations(monkeypatch):
+    calls = []
+
+    def fake_run(command, check):
+        calls.append(command)
+        return subprocess.CompletedProcess(command, 0)
+
+    monkeypatch.setattr(setup.subprocess, "run", fake_run)
+
+    setup.db_up()
+
+    assert calls == [
+        ["docker", "compose", "up", "barema_db", "-d"],
+        ["poetry", "run", "alembic", "upgrade", "head"],
+    ]